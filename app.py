@@ -1,45 +1,66 @@
 import logging
+import os
 from flask import Flask, request, jsonify
 from flask_cors import CORS
-from utils.cache import CacheManager
-from services.risk_service import RiskService, RisknetError
+from utils.cache import CacheManager, LocalTTLCache
+from services.risk_service import RiskService
 from utils.validation import InputValidator
 from utils.errors import RisknetError
 import config  # Import config module
 import time
 from utils.performance_monitor import PerformanceMonitor
+from utils.json_provider import ORJSONProvider
+from utils.logging_config import configure_logging
 
 # Configure logging
-logging.basicConfig(
-    level=logging.INFO,
-    format='%(asctime)s - %(name)s - %(levelname)s - %(message)s'
-)
+configure_logging()
 logger = logging.getLogger(__name__)
 
 app = Flask(__name__)
-CORS(app)
+app.json = ORJSONProvider(app)
+# Only the API routes are called cross-origin; let browsers cache preflights for a day
+CORS(
+    app,
+    resources={r"/api/*": {"origins": os.getenv('CORS_ORIGINS', '*').split(',')}},
+    max_age=86400
+)
 
-# Initialize services
+# Initialize services - the risk service shares the app's Redis connection
 cache_manager = CacheManager()
-risk_service = RiskService()
+risk_service = RiskService(cache_manager=cache_manager)
 validator = InputValidator()
 performance_monitor = PerformanceMonitor()
 
+# Serialized bodies for probe-heavy status endpoints, rebuilt at most once a second
+status_body_cache = LocalTTLCache(maxsize=8, ttl=1)
+
+def cached_json_response(key: str, build_payload):
+    """Serve a rarely-changing JSON payload from the short-lived status body cache"""
+    body = status_body_cache.get(key)
+    if body is None:
+        body = jsonify(build_payload()).get_data()
+        status_body_cache.set(key, body)
+    return app.response_class(body, mimetype='application/json')
+
 @app.route('/health', methods=['GET'])
 def health_check():
     """Health check endpoint with performance mode info"""
-    return jsonify({
+    return cached_json_response('health', build_health_payload)
+
+def build_health_payload():
+    """Build the health check payload"""
+    return {
         'status': 'healthy',
         'service': 'Risknet API',
         'version': '1.0.0',
         'fast_mode_enabled': risk_service.fast_mode,
         'optimizations': {
-            'parallel_processing': risk_service.fast_mode,
+            'parallel_processing': True,
             'web_search_fast_mode': risk_service.web_search_service.fast_mode,
             'ai_fast_mode': risk_service.ai_service.fast_mode
         },
         'timestamp': cache_manager._get_timestamp()
-    })
+    }
 
 @app.route('/api/performance/fast-mode', methods=['POST'])
 def set_fast_mode():
@@ -55,6 +76,7 @@ def set_fast_mode():
         risk_service.set_fast_mode(enabled)
         risk_service.web_search_service.set_fast_mode(enabled)
         risk_service.ai_service.set_fast_mode(enabled)
+        status_body_cache.clear()
         
         return jsonify({
             'message': f'Fast mode {"enabled" if enabled else "disabled"}',
@@ -63,19 +85,23 @@ def set_fast_mode():
         })
         
     except Exception as e:
-        logger.error(f"Failed to set fast mode: {str(e)}")
+        logger.error("Failed to set fast mode: %s", e)
         return jsonify({'error': str(e)}), 500
 
 @app.route('/api/performance/status', methods=['GET'])
 def get_performance_status():
     """Get current performance optimization status"""
-    return jsonify({
+    return cached_json_response('performance_status', build_performance_status_payload)
+
+def build_performance_status_payload():
+    """Build the performance status payload"""
+    return {
         'performance_mode': 'fast' if risk_service.fast_mode else 'full',
         'optimizations': {
             'risk_service_fast_mode': risk_service.fast_mode,
             'web_search_fast_mode': risk_service.web_search_service.fast_mode,
             'ai_fast_mode': risk_service.ai_service.fast_mode,
-            'parallel_processing': risk_service.fast_mode,
+            'parallel_processing': True,
             'caching_enabled': True
         },
         'api_availability': {
@@ -87,18 +113,18 @@ def get_performance_status():
         'speed_estimates': {
             'person_only': '2-5 seconds' if risk_service.fast_mode else '4-8 seconds',
             'company_only': '3-6 seconds' if risk_service.fast_mode else '5-10 seconds',
-            'person_and_company': '4-8 seconds (parallel)' if risk_service.fast_mode else '8-15 seconds (sequential)',
+            'person_and_company': '4-8 seconds (parallel)' if risk_service.fast_mode else '5-10 seconds (parallel)',
             'cached_requests': '< 0.1 seconds'
         }
-    })
+    }
 
 @app.route('/api/check_risk', methods=['POST'])
 def check_risk():
     """Enhanced risk assessment endpoint with flexible input handling and integrated relationship analysis"""
-    start_time = time.time()
+    start_time = time.perf_counter()
     try:
-        # Get request data
-        request_data = request.get_json()
+        # Get request data - malformed JSON is treated like a missing body
+        request_data = request.get_json(silent=True, cache=False)
         if not request_data:
             performance_monitor.track_request('/api/check_risk', start_time, False)
             return jsonify({
@@ -118,7 +144,7 @@ def check_risk():
         
         # Log the assessment type
         input_type = validated_data.get('input_type')
-        logger.info(f"Processing {input_type} risk assessment with integrated relationship analysis")
+        logger.info("Processing %s risk assessment with integrated relationship analysis", input_type)
         
         # Perform comprehensive risk assessment (includes relationship analysis)
         risk_result = risk_service.assess_risk(validated_data)
@@ -138,7 +164,7 @@ def check_risk():
         return jsonify(risk_result)
         
     except RisknetError as e:
-        logger.error(f"Risk assessment failed: {str(e)}")
+        logger.error("Risk assessment failed: %s", e)
         performance_monitor.track_request('/api/check_risk', start_time, False)
         return jsonify({
             'error': 'Risk assessment failed',
@@ -146,7 +172,7 @@ def check_risk():
         }), 500
         
     except Exception as e:
-        logger.error(f"Unexpected error in risk assessment: {str(e)}")
+        logger.error("Unexpected error in risk assessment: %s", e)
         performance_monitor.track_request('/api/check_risk', start_time, False)
         return jsonify({
             'error': 'Internal server error',
@@ -156,7 +182,7 @@ def check_risk():
 @app.route('/api/stats', methods=['GET'])
 def get_statistics():
     """Get API statistics and status"""
-    start_time = time.time()
+    start_time = time.perf_counter()
     try:
         stats = risk_service.get_statistics()
         performance_stats = performance_monitor.get_metrics()
@@ -164,7 +190,7 @@ def get_statistics():
         performance_monitor.track_request('/api/stats', start_time, True)
         return jsonify(stats)
     except Exception as e:
-        logger.error(f"Failed to get statistics: {str(e)}")
+        logger.error("Failed to get statistics: %s", e)
         performance_monitor.track_request('/api/stats', start_time, False)
         return jsonify({
             'error': 'Statistics unavailable',
@@ -173,27 +199,28 @@ def get_statistics():
 
 @app.route('/api/cache/clear', methods=['POST'])
 def clear_cache():
-    """Clear the cache"""
-    start_time = time.time()
+    """Clear the cache (Redis, plus the in-process caches of the worker serving this call)"""
+    start_time = time.perf_counter()
     try:
         cache_manager.clear()
+        if risk_service.neo4j_available:
+            risk_service.neo4j_service.clear_caches()
         performance_monitor.track_request('/api/cache/clear', start_time, True)
         return jsonify({
             'message': 'Cache cleared successfully',
             'timestamp': cache_manager._get_timestamp()
         })
     except Exception as e:
-        logger.error(f"Failed to clear cache: {str(e)}")
+        logger.error("Failed to clear cache: %s", e)
         performance_monitor.track_request('/api/cache/clear', start_time, False)
         return jsonify({
             'error': 'Failed to clear cache',
             'message': str(e)
         }), 500
 
-@app.errorhandler(404)
-def not_found(error):
-    """Handle 404 errors"""
-    return jsonify({
+# Error bodies never change, so serialize them once at import
+ERROR_BODIES = {
+    404: app.json.dumps({
         'error': 'Endpoint not found',
         'message': 'The requested endpoint does not exist',
         'available_endpoints': [
@@ -204,24 +231,32 @@ def not_found(error):
             'GET /api/performance/status',
             'POST /api/cache/clear'
         ]
-    }), 404
+    }).encode('utf-8'),
+    405: app.json.dumps({
+        'error': 'Method not allowed',
+        'message': 'The HTTP method is not allowed for this endpoint'
+    }).encode('utf-8'),
+    500: app.json.dumps({
+        'error': 'Internal server error',
+        'message': 'An unexpected error occurred'
+    }).encode('utf-8')
+}
+
+def error_response(status: int):
+    """Build a fresh response around a preserialized error body"""
+    return app.response_class(ERROR_BODIES[status], status=status, mimetype='application/json')
+
+@app.errorhandler(404)
+def not_found(error):
+    """Handle 404 errors"""
+    return error_response(404)
 
 @app.errorhandler(405)
 def method_not_allowed(error):
     """Handle 405 errors"""
-    return jsonify({
-        'error': 'Method not allowed',
-        'message': 'The HTTP method is not allowed for this endpoint'
-    }), 405
+    return error_response(405)
 
 @app.errorhandler(500)
 def internal_error(error):
     """Handle 500 errors"""
-    return jsonify({
-        'error': 'Internal server error',
-        'message': 'An unexpected error occurred'
-    }), 500
-
-if __name__ == '__main__':
-    logger.info("Starting Risknet API on port 5000")
-    app.run(host='0.0.0.0', port=5000, debug=True) 
\ No newline at end of file
+    return error_response(500)
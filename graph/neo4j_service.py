@@ -1,19 +1,311 @@
+import atexit
+import concurrent.futures
+import json
 import logging
 import os
-from typing import Dict, Any, List, Optional
+import threading
+from contextlib import contextmanager
+from functools import lru_cache
+from typing import Dict, Any, Iterator, List, Optional, Tuple
 from neo4j import GraphDatabase
 from neo4j.exceptions import ServiceUnavailable, AuthError, ClientError
+from utils.cache import LocalTTLCache
+from utils.errors import RisknetError
 import hashlib
 import time
-import uuid
-import config
+
+try:
+    import xxhash
+except ImportError:
+    xxhash = None
 
 logger = logging.getLogger(__name__)
 
+def _blake2b_short_hash(value: str) -> str:
+    """Return an 8 character blake2b hex digest used as a stable node ID suffix"""
+    return hashlib.blake2b(value.encode('utf-8'), digest_size=4).hexdigest()
+
+def _md5_short_hash(value: str) -> str:
+    """Return the legacy truncated md5 node ID suffix"""
+    return hashlib.md5(value.encode('utf-8'), usedforsecurity=False).hexdigest()[:8]
+
+def _xxhash_short_hash(value: str) -> str:
+    """Return an 8 character xxh64 hex digest (requires the optional xxhash package)"""
+    return xxhash.xxh64_hexdigest(value.encode('utf-8'))[:8]
+
+_HASH_FUNCTIONS = {
+    'blake2b': _blake2b_short_hash,
+    'md5': _md5_short_hash
+}
+if xxhash is not None:
+    _HASH_FUNCTIONS['xxhash'] = _xxhash_short_hash
+
+# Node IDs are derived from these digests, and existing graphs use md5 IDs. Changing the
+# algorithm without migrating node IDs creates a second, disconnected set of nodes, so the
+# faster digests are opt-in for new graphs only.
+HASH_ALGO = os.getenv('HASH_ALGO', 'md5').lower()
+if HASH_ALGO not in _HASH_FUNCTIONS:
+    logger.warning("Unknown or unavailable HASH_ALGO '%s', falling back to md5", HASH_ALGO)
+    HASH_ALGO = 'md5'
+_short_hash = _HASH_FUNCTIONS[HASH_ALGO]
+
+@lru_cache(maxsize=65536)
+def _entity_id(entity_type: str, name_lower: str) -> str:
+    """Map an entity type and lowercased name to its stable node id"""
+    prefix = "company" if entity_type == 'company' else "entity"
+    return f"{prefix}_{_short_hash(name_lower)}"
+
+def _payload_hash(*payloads: Any) -> str:
+    """Return a content hash of the given JSON-like payloads"""
+    serialized = json.dumps(payloads, sort_keys=True, default=str)
+    return hashlib.blake2b(serialized.encode('utf-8'), digest_size=16).hexdigest()
+
+# Cypher statements are defined once so every call sends the identical query text.
+# Entity updated_at only moves when the risk level changes, so refreshes do not rewrite it.
+# Batched link statements resolve the owning entity once, before fanning out over $rows.
+_Q_MERGE_PERSON = """
+MERGE (p:Person:Entity {id: $entity_id})
+ON CREATE SET p.created_at = $timestamp,
+              p.updated_at = $timestamp
+ON MATCH SET p.updated_at = CASE WHEN p.risk_level = $risk_level THEN p.updated_at ELSE $timestamp END
+SET p.name = $name,
+    p.type = $type,
+    p.phone = $phone,
+    p.email = $email,
+    p.address = $address,
+    p.country = $country,
+    p.date_of_birth = $date_of_birth,
+    p.risk_level = $risk_level
+"""
+
+_Q_MERGE_COMPANY = """
+MERGE (c:Company:Entity {id: $entity_id})
+ON CREATE SET c.created_at = $timestamp,
+              c.updated_at = $timestamp
+ON MATCH SET c.updated_at = CASE WHEN c.risk_level = $risk_level THEN c.updated_at ELSE $timestamp END
+SET c.name = $name,
+    c.type = $type,
+    c.phone = $phone,
+    c.address = $address,
+    c.country = $country,
+    c.industry = $industry,
+    c.registration_number = $registration_number,
+    c.website = $website,
+    c.incorporation_date = $incorporation_date,
+    c.risk_level = $risk_level
+"""
+
+_Q_MERGE_ENTITY = """
+MERGE (e:Entity {id: $entity_id})
+ON CREATE SET e.created_at = $timestamp,
+              e.updated_at = $timestamp
+ON MATCH SET e.updated_at = CASE WHEN e.risk_level = $risk_level THEN e.updated_at ELSE $timestamp END
+SET e.name = $name,
+    e.type = $type,
+    e.risk_level = $risk_level
+"""
+
+_Q_MERGE_WEB_SOURCES = """
+MATCH (e:Entity {id: $entity_id})
+UNWIND $rows AS row
+MERGE (w:WebSource {id: row.id})
+SET w.title = row.title,
+    w.url = row.url,
+    w.source = row.source,
+    w.relevance_score = row.relevance_score
+MERGE (e)-[r:MENTIONED_IN]->(w)
+ON CREATE SET r.created_at = $timestamp
+SET r.relevance_score = row.relevance_score
+"""
+
+_Q_MERGE_RISK_INDICATORS = """
+MATCH (e:Entity {id: $entity_id})
+UNWIND $rows AS row
+MERGE (r:RiskIndicator {id: row.id})
+SET r.description = row.description,
+    r.type = row.type
+MERGE (e)-[rel:HAS_RISK]->(r)
+ON CREATE SET rel.created_at = $timestamp
+"""
+
+_Q_MERGE_SANCTIONS = """
+MATCH (e:Entity {id: $entity_id})
+UNWIND $rows AS row
+MERGE (s:Sanction {id: row.id})
+SET s.description = row.description,
+    s.confidence = row.confidence,
+    s.type = row.type
+MERGE (e)-[rel:HAS_SANCTION]->(s)
+ON CREATE SET rel.created_at = $timestamp
+SET rel.confidence = row.confidence
+"""
+
+_Q_ANALYZE_CONNECTIONS = """
+MATCH (e:Entity {id: $entity_id})
+RETURN e.id AS entity_id,
+       COUNT { (e)-->() } AS connection_count,
+       COUNT { (e)-->(n) WHERE n:RiskIndicator OR n:Sanction } AS risk_count,
+       COLLECT {
+           MATCH (e)-[r]->(n)
+           RETURN {rel_type: type(r), node_type: labels(n), node_id: n.id}
+           ORDER BY type(r)
+           SKIP $skip LIMIT $limit
+       } AS detailed_connections
+"""
+
+_Q_ENTITY_CONNECTIONS = """
+MATCH (e:Entity {id: $entity_id})-[r]->(n)
+RETURN type(r) AS rel_type, labels(n) AS node_type, n.id AS node_id
+ORDER BY rel_type
+"""
+
+_Q_ENTITY_GRAPH = """
+MATCH (e:Entity {id: $entity_id})
+OPTIONAL MATCH (e)-[r]->(n)
+WITH e,
+     collect(DISTINCT CASE WHEN n IS NOT NULL
+                           THEN {id: n.id, labels: labels(n), properties: properties(n)} END) as nodes,
+     collect(DISTINCT CASE WHEN r IS NOT NULL THEN {
+         id: elementId(r),
+         type: type(r),
+         startNode: elementId(startNode(r)),
+         endNode: elementId(endNode(r)),
+         properties: properties(r)
+     } END) as relationships
+RETURN {id: e.id, labels: labels(e), properties: properties(e)} as entity, nodes, relationships
+"""
+
+_Q_MERGE_DIRECTOR = """
+MERGE (d:Director:Person:Entity {id: $director_id})
+SET d.name = $name,
+    d.director_id = $external_director_id,
+    d.position = $position,
+    d.appointment_date = $appointment_date,
+    d.status = $status,
+    d.type = 'director',
+    d.updated_at = $timestamp
+"""
+
+_Q_LINK_DIRECTOR = """
+MATCH (d:Director {director_id: $director_id})
+MATCH (c:Company {id: $company_id})
+MERGE (d)-[r:DIRECTOR_OF]->(c)
+ON CREATE SET r.created_at = $timestamp
+SET r.position = $position,
+    r.appointment_date = $appointment_date,
+    r.status = $status
+"""
+
+_Q_MERGE_DIRECTORS = """
+UNWIND $rows AS row
+MERGE (d:Director:Person:Entity {id: row.id})
+SET d.name = row.name,
+    d.director_id = row.director_id,
+    d.position = row.position,
+    d.appointment_date = row.appointment_date,
+    d.status = row.status,
+    d.type = 'director',
+    d.updated_at = $timestamp
+"""
+
+_Q_LINK_DIRECTORS = """
+MATCH (c:Company {id: $company_id})
+UNWIND $rows AS row
+MATCH (d:Director {director_id: row.director_id})
+MERGE (d)-[r:DIRECTOR_OF]->(c)
+ON CREATE SET r.created_at = $timestamp
+SET r.position = row.position,
+    r.appointment_date = row.appointment_date,
+    r.status = row.status
+"""
+
+_Q_LINK_PERSON_DIRECTOR = """
+MATCH (p:Person {id: $director_id})
+MATCH (c:Company {id: $company_id})
+MERGE (p)-[r:DIRECTOR_OF]->(c)
+ON CREATE SET r.created_at = $timestamp
+RETURN r
+"""
+
+_Q_LINK_PERSON_COMPANY = """
+MATCH (p:Entity {id: $person_id})
+MATCH (c:Entity {id: $company_id})
+MERGE (p)-[r:ASSOCIATED_WITH]->(c)
+ON CREATE SET r.created_at = $timestamp
+SET r.type = $relationship_type
+RETURN r
+"""
+
+_Q_FIND_RELATIONSHIPS = """
+MATCH (e:Entity {id: $entity_id})-[r]-(related)
+RETURN type(r) as relationship_type,
+       e.name as entity_name,
+       related.name as related_name,
+       related.id as related_id,
+       related.type as related_type
+"""
+
+_DDL_STATEMENTS = (
+    # Constraints
+    "CREATE CONSTRAINT IF NOT EXISTS FOR (e:Entity) REQUIRE e.id IS UNIQUE",
+    "CREATE CONSTRAINT IF NOT EXISTS FOR (c:Company) REQUIRE c.id IS UNIQUE",
+    "CREATE CONSTRAINT IF NOT EXISTS FOR (p:Person) REQUIRE p.id IS UNIQUE",
+    "CREATE CONSTRAINT IF NOT EXISTS FOR (d:Director) REQUIRE d.id IS UNIQUE",
+    "CREATE CONSTRAINT IF NOT EXISTS FOR (w:WebSource) REQUIRE w.id IS UNIQUE",
+    "CREATE CONSTRAINT IF NOT EXISTS FOR (r:RiskIndicator) REQUIRE r.id IS UNIQUE",
+    "CREATE CONSTRAINT IF NOT EXISTS FOR (s:Sanction) REQUIRE s.id IS UNIQUE",
+    # Indexes
+    "CREATE INDEX IF NOT EXISTS FOR (e:Entity) ON (e.name)",
+    "CREATE INDEX IF NOT EXISTS FOR (c:Company) ON (c.name)",
+    "CREATE INDEX IF NOT EXISTS FOR (p:Person) ON (p.name)",
+    "CREATE INDEX IF NOT EXISTS FOR (d:Director) ON (d.name)",
+    "CREATE INDEX IF NOT EXISTS FOR (d:Director) ON (d.director_id)",
+    "CREATE INDEX IF NOT EXISTS FOR (w:WebSource) ON (w.url)",
+    "CREATE INDEX IF NOT EXISTS FOR (r:RiskIndicator) ON (r.type)",
+    "CREATE INDEX IF NOT EXISTS FOR (s:Sanction) ON (s.type)",
+)
+
+# Default number of detailed connections returned per analysis page
+_CONNECTION_PAGE_SIZE = 1000
+
+# Hot read templates replayed at startup so their plans are cached before real traffic
+_WARMUP_QUERIES = (_Q_ANALYZE_CONNECTIONS, _Q_ENTITY_GRAPH, _Q_FIND_RELATIONSHIPS)
+_WARMUP_PARAMETERS = {'entity_id': "__warmup__", 'skip': 0, 'limit': 1}
+
+def _fetch_all(tx, query: str, parameters: Dict[str, Any]) -> List[Dict[str, Any]]:
+    """Transaction function returning every record as a dict"""
+    return tx.run(query, parameters).data()
+
+def _fetch_single(tx, query: str, parameters: Dict[str, Any]):
+    """Transaction function returning at most one record"""
+    return tx.run(query, parameters).single()
+
+def _run_statements(tx, statements):
+    """Transaction function running parameterless statements in order"""
+    for statement in statements:
+        tx.run(statement).consume()
+
+class _ThreadSession:
+    """Holds a thread's reusable session and closes it when the thread's locals are released"""
+    __slots__ = ('session',)
+    
+    def __init__(self, session):
+        self.session = session
+    
+    def __del__(self):
+        try:
+            self.session.close()
+        except Exception:
+            pass
+
 class Neo4jService:
     """Service for graph database operations"""
     
-    def __init__(self, uri: str = None, user: str = None, password: str = None):
+    # Schema DDL is idempotent, so it only needs to run once per process
+    _constraints_applied = False
+    _schema_lock = threading.Lock()
+    
+    def __init__(self, uri: str = None, user: str = None, password: str = None, verify_connectivity: bool = True):
         """Initialize Neo4j connection with connection retry logic"""
         self.uri = uri or "bolt://opensancton_neo4j:7687"
         self.user = user or "neo4j"
@@ -21,6 +313,29 @@ class Neo4jService:
         self.driver = None
         self.max_retries = 3
         self.retry_delay = 2  # seconds
+        self.verify_connectivity = verify_connectivity
+        
+        # Connection pool tuning - shared by all request threads in a worker
+        self.pool_size = int(os.getenv('NEO4J_POOL_SIZE', 50))
+        self.acquire_timeout = float(os.getenv('NEO4J_ACQUIRE_TIMEOUT_S', 30))
+        self.max_connection_lifetime = int(os.getenv('NEO4J_MAX_CONNECTION_LIFETIME_S', 3600))
+        
+        # One long-lived session per worker thread, created on first use
+        self._local = threading.local()
+        
+        # Long-lived pool for concurrent upserts, so its threads keep their sessions between calls
+        self._write_executor = concurrent.futures.ThreadPoolExecutor(
+            max_workers=min(int(os.getenv('NEO4J_WRITE_WORKERS', 8)), self.pool_size),
+            thread_name_prefix='neo4j-write'
+        )
+        
+        # Content hash of the last payload written per entity, used to skip no-op refreshes.
+        # The TTL bounds how long a change made outside this process (another worker, an
+        # admin edit, a cleanup job) can hide behind a skipped identical write
+        self._written_hashes = LocalTTLCache(
+            maxsize=int(os.getenv('ENTITY_HASH_CACHE_SIZE', 50000)),
+            ttl=int(os.getenv('ENTITY_HASH_CACHE_TTL', 60))
+        )
         
         # Try to establish connection with retries
         self._connect_with_retry()
@@ -32,342 +347,309 @@ class Neo4jService:
                 self.driver = GraphDatabase.driver(
                     self.uri,
                     auth=(self.user, self.password),
-                    max_connection_lifetime=3600
+                    max_connection_pool_size=self.pool_size,
+                    connection_acquisition_timeout=self.acquire_timeout,
+                    max_connection_lifetime=self.max_connection_lifetime,
+                    keep_alive=True
                 )
-                # Test connection
-                with self.driver.session() as session:
-                    session.run("RETURN 1")
-                logger.info("Successfully connected to Neo4j")
+                # Test connection without opening a session; skipped when the caller opts out
+                if self.verify_connectivity:
+                    self.driver.verify_connectivity()
+                logger.info("Successfully connected to Neo4j (pool size: %s, acquisition timeout: %ss)", self.pool_size, self.acquire_timeout)
                 return
             except (ServiceUnavailable, AuthError, ClientError) as e:
+                # Don't leak the failed driver's pool across retries
+                if self.driver:
+                    self.driver.close()
+                    self.driver = None
                 if attempt < self.max_retries - 1:
-                    logger.warning(f"Neo4j connection attempt {attempt + 1} failed: {str(e)}. Retrying in {self.retry_delay} seconds...")
+                    logger.warning("Neo4j connection attempt %s failed: %s. Retrying in %s seconds...", attempt + 1, e, self.retry_delay)
                     time.sleep(self.retry_delay)
                 else:
-                    logger.error(f"Failed to connect to Neo4j after {self.max_retries} attempts: {str(e)}")
+                    logger.error("Failed to connect to Neo4j after %s attempts: %s", self.max_retries, e)
                     raise
     
-    def _execute_query(self, query: str, parameters: Dict[str, Any] = None) -> List[Dict[str, Any]]:
-        """Execute a Neo4j query with error handling"""
+    @contextmanager
+    def _session(self):
+        """Yield this thread's reusable session, discarding it if the work fails"""
+        holder = getattr(self._local, 'holder', None)
+        if holder is None or holder.session.closed():
+            holder = self._local.holder = _ThreadSession(self.driver.session())
+        
+        try:
+            yield holder.session
+        except Exception:
+            # A failed session may be left mid-transaction, so release its connection
+            # now and start fresh next time
+            try:
+                holder.session.close()
+            except Exception as close_error:
+                logger.debug("Failed to close Neo4j session after error: %s", close_error)
+            self._local.holder = None
+            raise
+    
+    def clear_caches(self):
+        """Forget the written payload hashes held by this process"""
+        self._written_hashes.clear()
+    
+    def _execute_query(self, query: str, parameters: Dict[str, Any] = None, write: bool = False) -> List[Dict[str, Any]]:
+        """Execute a Neo4j query in a managed read or write transaction"""
         if not self.driver:
             raise ServiceUnavailable("Neo4j driver not initialized")
         
         try:
-            with self.driver.session() as session:
-                result = session.run(query, parameters or {})
-                return [dict(record) for record in result]
+            with self._session() as session:
+                execute = session.execute_write if write else session.execute_read
+                return execute(_fetch_all, query, parameters or {})
         except Exception as e:
-            logger.error(f"Query execution failed: {str(e)}")
+            logger.error("Query execution failed: %s", e)
             raise
     
     def _create_constraints(self):
-        """Create database constraints and indexes"""
-        try:
-            with self.driver.session() as session:
-                # Create constraints
-                session.run("CREATE CONSTRAINT IF NOT EXISTS FOR (e:Entity) REQUIRE e.id IS UNIQUE")
-                session.run("CREATE CONSTRAINT IF NOT EXISTS FOR (c:Company) REQUIRE c.id IS UNIQUE")
-                session.run("CREATE CONSTRAINT IF NOT EXISTS FOR (p:Person) REQUIRE p.id IS UNIQUE")
-                session.run("CREATE CONSTRAINT IF NOT EXISTS FOR (d:Director) REQUIRE d.id IS UNIQUE")
-                session.run("CREATE CONSTRAINT IF NOT EXISTS FOR (w:WebSource) REQUIRE w.id IS UNIQUE")
-                session.run("CREATE CONSTRAINT IF NOT EXISTS FOR (r:RiskIndicator) REQUIRE r.id IS UNIQUE")
-                
-                # Create indexes
-                session.run("CREATE INDEX IF NOT EXISTS FOR (e:Entity) ON (e.name)")
-                session.run("CREATE INDEX IF NOT EXISTS FOR (c:Company) ON (c.name)")
-                session.run("CREATE INDEX IF NOT EXISTS FOR (p:Person) ON (p.name)")
-                session.run("CREATE INDEX IF NOT EXISTS FOR (d:Director) ON (d.name)")
-                session.run("CREATE INDEX IF NOT EXISTS FOR (w:WebSource) ON (w.url)")
-                session.run("CREATE INDEX IF NOT EXISTS FOR (r:RiskIndicator) ON (r.type)")
+        """Create database constraints and indexes once per process"""
+        with Neo4jService._schema_lock:
+            if Neo4jService._constraints_applied:
+                return
+            
+            try:
+                with self.driver.session() as session:
+                    session.execute_write(_run_statements, _DDL_STATEMENTS)
                 
+                Neo4jService._constraints_applied = True
                 logger.info("Database constraints and indexes created successfully")
-        except Exception as e:
-            logger.error(f"Failed to create constraints: {str(e)}")
-            raise
+            except Exception as e:
+                logger.error("Failed to create constraints: %s", e)
+                raise
+        
+        self._warm_query_plans()
+
+    def _warm_query_plans(self):
+        """Run the hot read queries once against a sentinel id to prime the plan cache"""
+        for query in _WARMUP_QUERIES:
+            try:
+                with self._session() as session:
+                    session.execute_read(_fetch_all, query, _WARMUP_PARAMETERS)
+            except Exception as e:
+                logger.debug("Query plan warm-up skipped: %s", e)
     
     def create_or_update_entity(self, entity_data: Dict[str, Any], sanctions_data: Dict[str, Any], web_data: Dict[str, Any]) -> str:
         """Create or update an entity in the graph database"""
         try:
             # Generate entity ID
             entity_id = self._generate_entity_id(entity_data)
+            
+            # Identical re-ingests leave the graph unchanged, so skip the write entirely
+            payload_hash = _payload_hash(entity_data, sanctions_data, web_data)
+            if self._written_hashes.get(entity_id) == payload_hash:
+                return entity_id
+            
             entity_type = entity_data.get('type', 'unknown')
+            timestamp = int(time.time())
+            risk_level = self._determine_risk_level(sanctions_data, web_data)
             
-            with self.driver.session() as session:
-                # Create/update specific entity type node
-                if entity_type == 'person':
-                    session.run("""
-                        MERGE (p:Person:Entity {id: $entity_id})
-                        SET p.name = $name,
-                            p.type = $type,
-                            p.phone = $phone,
-                            p.email = $email,
-                            p.address = $address,
-                            p.country = $country,
-                            p.date_of_birth = $date_of_birth,
-                            p.risk_level = $risk_level,
-                            p.updated_at = $timestamp
-                    """, 
-                    entity_id=entity_id,
-                    name=entity_data.get('name', ''),
-                    type=entity_type,
-                    phone=entity_data.get('phone', ''),
-                    email=entity_data.get('email', ''),
-                    address=entity_data.get('address', ''),
-                    country=entity_data.get('country', ''),
-                    date_of_birth=entity_data.get('date_of_birth', ''),
-                    risk_level=self._determine_risk_level(sanctions_data, web_data),
-                    timestamp=int(time.time())
-                    )
-                
-                elif entity_type == 'company':
-                    session.run("""
-                        MERGE (c:Company:Entity {id: $entity_id})
-                        SET c.name = $name,
-                            c.type = $type,
-                            c.phone = $phone,
-                            c.address = $address,
-                            c.country = $country,
-                            c.industry = $industry,
-                            c.registration_number = $registration_number,
-                            c.website = $website,
-                            c.incorporation_date = $incorporation_date,
-                            c.risk_level = $risk_level,
-                            c.updated_at = $timestamp
-                    """, 
-                    entity_id=entity_id,
-                    name=entity_data.get('name', ''),
-                    type=entity_type,
-                    phone=entity_data.get('phone', ''),
-                    address=entity_data.get('address', ''),
-                    country=entity_data.get('country', ''),
-                    industry=entity_data.get('industry', ''),
-                    registration_number=entity_data.get('registration_number', ''),
-                    website=entity_data.get('website', ''),
-                    incorporation_date=entity_data.get('incorporation_date', ''),
-                    risk_level=self._determine_risk_level(sanctions_data, web_data),
-                    timestamp=int(time.time())
-                    )
-                
-                else:
-                    # Generic entity
-                    session.run("""
-                        MERGE (e:Entity {id: $entity_id})
-                        SET e.name = $name,
-                            e.type = $type,
-                            e.risk_level = $risk_level,
-                            e.updated_at = $timestamp
-                    """, 
-                    entity_id=entity_id,
-                    name=entity_data.get('name', ''),
-                    type=entity_type,
-                    risk_level=self._determine_risk_level(sanctions_data, web_data),
-                    timestamp=int(time.time())
-                    )
-                
-                # Create web source relationships
-                for result in web_data.get('results', []):
-                    url = result.get('url', result.get('link', ''))
-                    source_id = f"source_{hashlib.md5(url.encode()).hexdigest()[:8]}"
-                    
-                    # Create web source node
-                    session.run("""
-                        MERGE (w:WebSource {id: $source_id})
-                        SET w.title = $title,
-                            w.url = $url,
-                            w.source = $source,
-                            w.relevance_score = $relevance_score
-                    """,
-                        source_id=source_id,
-                        title=result.get('title', ''),
-                        url=url,
-                        source=result.get('source', ''),
-                        relevance_score=result.get('relevance_score', 0.0)
-                    )
-                    
-                    # Create relationship
-                    session.run("""
-                        MATCH (e:Entity {id: $entity_id})
-                        MATCH (w:WebSource {id: $source_id})
-                        MERGE (e)-[r:MENTIONED_IN]->(w)
-                        SET r.relevance_score = $relevance_score,
-                            r.created_at = $timestamp
-                    """,
-                        entity_id=entity_id,
-                        source_id=source_id,
-                        relevance_score=result.get('relevance_score', 0.0),
-                        timestamp=int(time.time())
-                    )
-                
-                # Create risk indicators
-                for indicator in web_data.get('risk_indicators', []):
-                    indicator_id = f"risk_{hashlib.md5(indicator.encode()).hexdigest()[:8]}"
-                    
-                    # Create risk indicator node
-                    session.run("""
-                        MERGE (r:RiskIndicator {id: $indicator_id})
-                        SET r.description = $description,
-                            r.type = $type
-                    """,
-                        indicator_id=indicator_id,
-                        description=indicator,
-                        type=indicator.split(':')[0].strip()
-                    )
-                    
-                    # Create relationship
-                    session.run("""
-                        MATCH (e:Entity {id: $entity_id})
-                        MATCH (r:RiskIndicator {id: $indicator_id})
-                        MERGE (e)-[rel:HAS_RISK]->(r)
-                        SET rel.created_at = $timestamp
-                    """,
-                        entity_id=entity_id,
-                        indicator_id=indicator_id,
-                        timestamp=int(time.time())
-                    )
-                
-                # Create sanctions relationships
-                for match in sanctions_data.get('matches', []):
-                    sanction_id = f"sanction_{hashlib.md5(str(match).encode()).hexdigest()[:8]}"
-                    
-                    # Create sanction node
-                    session.run("""
-                        MERGE (s:Sanction {id: $sanction_id})
-                        SET s.description = $description,
-                            s.confidence = $confidence,
-                            s.type = $type
-                    """,
-                        sanction_id=sanction_id,
-                        description=match.get('description', ''),
-                        confidence=match.get('confidence', 0),
-                        type=match.get('type', 'unknown')
-                    )
-                    
-                    # Create relationship
-                    session.run("""
-                        MATCH (e:Entity {id: $entity_id})
-                        MATCH (s:Sanction {id: $sanction_id})
-                        MERGE (e)-[rel:HAS_SANCTION]->(s)
-                        SET rel.confidence = $confidence,
-                            rel.created_at = $timestamp
-                    """,
-                        entity_id=entity_id,
-                        sanction_id=sanction_id,
-                        confidence=match.get('confidence', 0),
-                        timestamp=int(time.time())
-                    )
+            # Create/update specific entity type node
+            if entity_type == 'person':
+                entity_query = _Q_MERGE_PERSON
+                entity_params = {
+                    'name': entity_data.get('name', ''),
+                    'type': entity_type,
+                    'phone': entity_data.get('phone', ''),
+                    'email': entity_data.get('email', ''),
+                    'address': entity_data.get('address', ''),
+                    'country': entity_data.get('country', ''),
+                    'date_of_birth': entity_data.get('date_of_birth', ''),
+                    'risk_level': risk_level
+                }
             
+            elif entity_type == 'company':
+                entity_query = _Q_MERGE_COMPANY
+                entity_params = {
+                    'name': entity_data.get('name', ''),
+                    'type': entity_type,
+                    'phone': entity_data.get('phone', ''),
+                    'address': entity_data.get('address', ''),
+                    'country': entity_data.get('country', ''),
+                    'industry': entity_data.get('industry', ''),
+                    'registration_number': entity_data.get('registration_number', ''),
+                    'website': entity_data.get('website', ''),
+                    'incorporation_date': entity_data.get('incorporation_date', ''),
+                    'risk_level': risk_level
+                }
+            
+            else:
+                # Generic entity
+                entity_query = _Q_MERGE_ENTITY
+                entity_params = {
+                    'name': entity_data.get('name', ''),
+                    'type': entity_type,
+                    'risk_level': risk_level
+                }
+            
+            # Build linked node rows up front so every write goes out in one transaction.
+            # Rows are keyed by node ID so duplicate inputs collapse to one MERGE (last one wins).
+            web_rows = {}
+            for result in web_data.get('results', []):
+                url = result.get('url', result.get('link', ''))
+                source_id = f"source_{_short_hash(url)}"
+                web_rows[source_id] = {
+                    'id': source_id,
+                    'title': result.get('title', ''),
+                    'url': url,
+                    'source': result.get('source', ''),
+                    'relevance_score': result.get('relevance_score', 0.0)
+                }
+            
+            risk_rows = {}
+            for indicator in web_data.get('risk_indicators', []):
+                indicator_id = f"risk_{_short_hash(indicator)}"
+                risk_rows[indicator_id] = {
+                    'id': indicator_id,
+                    'description': indicator,
+                    'type': indicator.split(':')[0].strip()
+                }
+            
+            sanction_rows = {}
+            for match in sanctions_data.get('matches', []):
+                # Key on a canonical serialization so the id does not depend on dict ordering
+                sanction_id = f"sanction_{_short_hash(json.dumps(match, sort_keys=True, separators=(',', ':'), default=str))}"
+                sanction_rows[sanction_id] = {
+                    'id': sanction_id,
+                    'description': match.get('description', ''),
+                    'confidence': match.get('confidence', 0),
+                    'type': match.get('type', 'unknown')
+                }
+            
+            with self._session() as session:
+                session.execute_write(
+                    self._write_entity_graph, entity_query, entity_params, entity_id,
+                    list(web_rows.values()), list(risk_rows.values()), list(sanction_rows.values()), timestamp
+                )
+            
+            self._written_hashes.set(entity_id, payload_hash)
             return entity_id
             
         except Exception as e:
-            logger.error(f"Failed to create/update entity: {str(e)}")
+            logger.error("Failed to create/update entity: %s", e)
             raise
     
-    def analyze_entity_connections(self, entity_id: str) -> Dict[str, Any]:
-        """Analyze entity connections and risk factors"""
+    def create_or_update_entities(self, entities: List[Tuple[Dict[str, Any], Dict[str, Any], Dict[str, Any]]]) -> List[Optional[str]]:
+        """Upsert several (entity_data, sanctions_data, web_data) entries concurrently"""
+        if not entities:
+            return []
+        
+        if len(entities) == 1:
+            # Nothing to overlap, so reuse the calling thread's session
+            try:
+                return [self.create_or_update_entity(*entities[0])]
+            except Exception:
+                return [None]
+        
+        # Each pool thread keeps its own session, so the upserts overlap their Bolt round-trips
+        futures = [self._write_executor.submit(self.create_or_update_entity, *args) for args in entities]
+        
+        # Results keep input order; failures are already logged by create_or_update_entity
+        entity_ids = []
+        for future in futures:
+            try:
+                entity_ids.append(future.result())
+            except Exception:
+                entity_ids.append(None)
+        return entity_ids
+    
+    def _write_entity_graph(self, tx, entity_query: str, entity_params: Dict[str, Any], entity_id: str,
+                            web_rows: List[Dict[str, Any]], risk_rows: List[Dict[str, Any]],
+                            sanction_rows: List[Dict[str, Any]], timestamp: int):
+        """Merge an entity node and its linked web source, risk indicator and sanction nodes"""
+        tx.run(entity_query, entity_params, entity_id=entity_id, timestamp=timestamp).consume()
+        
+        if web_rows:
+            tx.run(_Q_MERGE_WEB_SOURCES, rows=web_rows, entity_id=entity_id, timestamp=timestamp).consume()
+        
+        if risk_rows:
+            tx.run(_Q_MERGE_RISK_INDICATORS, rows=risk_rows, entity_id=entity_id, timestamp=timestamp).consume()
+        
+        if sanction_rows:
+            tx.run(_Q_MERGE_SANCTIONS, rows=sanction_rows, entity_id=entity_id, timestamp=timestamp).consume()
+    
+    def analyze_entity_connections(self, entity_id: str, limit: int = _CONNECTION_PAGE_SIZE, skip: int = 0) -> Dict[str, Any]:
+        """Analyze entity connections and risk factors, paging the detailed connection list"""
         try:
-            with self.driver.session() as session:
-                # Get entity details
-                entity_result = session.run("""
-                    MATCH (e:Entity {id: $entity_id})
-                    RETURN e
-                """, entity_id=entity_id).single()
+            with self._session() as session:
+                # Existence, counts and one page of details in a single round-trip
+                record = session.execute_read(_fetch_single, _Q_ANALYZE_CONNECTIONS, {
+                    'entity_id': entity_id,
+                    'skip': skip,
+                    'limit': limit
+                })
                 
-                if not entity_result:
-                    return {
+                if not record:
+                    analysis = {
                         'analysis': 'Entity not found',
                         'connection_count': 0,
                         'risk_connections': 0
                     }
+                else:
+                    analysis = {
+                        'analysis': 'Entity connections analyzed',
+                        'connection_count': record['connection_count'],
+                        'risk_connections': record['risk_count'],
+                        'detailed_connections': record['detailed_connections']
+                    }
                 
-                # Count connections
-                connection_result = session.run("""
-                    MATCH (e:Entity {id: $entity_id})-[r]->(n)
-                    RETURN count(r) as connection_count
-                """, entity_id=entity_id).single()
-                
-                # Count risk connections
-                risk_result = session.run("""
-                    MATCH (e:Entity {id: $entity_id})-[r]->(n)
-                    WHERE n:RiskIndicator OR n:Sanction
-                    RETURN count(r) as risk_count
-                """, entity_id=entity_id).single()
-                
-                # Get detailed analysis
-                analysis_result = session.run("""
-                    MATCH (e:Entity {id: $entity_id})-[r]->(n)
-                    RETURN type(r) as rel_type, labels(n) as node_type, n.id as node_id
-                    ORDER BY rel_type
-                """, entity_id=entity_id).data()
-                
-                return {
-                    'analysis': 'Entity connections analyzed',
-                    'connection_count': connection_result['connection_count'],
-                    'risk_connections': risk_result['risk_count'],
-                    'detailed_connections': analysis_result
-                }
+                return analysis
                 
         except Exception as e:
-            logger.error(f"Failed to analyze entity connections: {str(e)}")
+            logger.error("Failed to analyze entity connections: %s", e)
             return {
                 'analysis': f'Error: {str(e)}',
                 'connection_count': 0,
                 'risk_connections': 0
             }
     
+    def iter_entity_connections(self, entity_id: str) -> Iterator[Dict[str, Any]]:
+        """Yield an entity's outgoing connections one record at a time"""
+        if not self.driver:
+            raise ServiceUnavailable("Neo4j driver not initialized")
+        
+        # A dedicated session keeps the result cursor open while the caller iterates,
+        # so high-fanout entities are never materialized as a single list
+        with self.driver.session() as session:
+            result = session.run(_Q_ENTITY_CONNECTIONS, entity_id=entity_id)
+            for record in result:
+                yield {
+                    'rel_type': record['rel_type'],
+                    'node_type': record['node_type'],
+                    'node_id': record['node_id']
+                }
+    
     def get_entity_graph_data(self, entity_id: str) -> Dict[str, Any]:
         """Get complete graph data for an entity"""
         try:
-            with self.driver.session() as session:
+            with self._session() as session:
                 # Get all nodes and relationships
-                result = session.run("""
-                    MATCH (e:Entity {id: $entity_id})
-                    CALL {
-                        WITH e
-                        MATCH (e)-[r]->(n)
-                        RETURN collect(DISTINCT n) as nodes,
-                               collect(DISTINCT r) as relationships
-                    }
-                    RETURN e as entity, nodes, relationships
-                """, entity_id=entity_id).single()
+                result = session.execute_read(_fetch_single, _Q_ENTITY_GRAPH, {'entity_id': entity_id})
                 
                 if not result:
-                    return {
+                    graph_data = {
                         'entity_id': entity_id,
                         'nodes': [],
                         'relationships': []
                     }
+                    return graph_data
                 
-                # Format nodes
-                nodes = [{
-                    'id': node['id'],
-                    'labels': list(node.labels),
-                    'properties': dict(node)
-                } for node in result['nodes']]
-                
-                # Add entity node
-                nodes.append({
-                    'id': result['entity']['id'],
-                    'labels': list(result['entity'].labels),
-                    'properties': dict(result['entity'])
-                })
-                
-                # Format relationships
-                relationships = [{
-                    'id': rel.id,
-                    'type': type(rel).__name__,
-                    'startNode': rel.start_node.id,
-                    'endNode': rel.end_node.id,
-                    'properties': dict(rel)
-                } for rel in result['relationships']]
+                # Nodes and relationships arrive already projected into response-shaped maps
+                nodes = result['nodes']
+                nodes.append(result['entity'])
                 
-                return {
+                graph_data = {
                     'entity_id': entity_id,
                     'nodes': nodes,
-                    'relationships': relationships
+                    'relationships': result['relationships']
                 }
+                return graph_data
                 
         except Exception as e:
-            logger.error(f"Failed to get entity graph data: {str(e)}")
+            logger.error("Failed to get entity graph data: %s", e)
             return {
                 'entity_id': entity_id,
                 'nodes': [],
@@ -376,28 +658,26 @@ class Neo4jService:
     
     def _generate_entity_id(self, entity_data: Dict[str, Any]) -> str:
         """Generate a unique entity ID"""
-        entity_type = entity_data.get('type', 'unknown')
-        name = entity_data.get('name', '')
-        
-        if entity_type == 'company':
-            return f"company_{hashlib.md5(name.lower().encode()).hexdigest()[:8]}"
-        else:
-            return f"entity_{hashlib.md5(name.lower().encode()).hexdigest()[:8]}"
+        return _entity_id(entity_data.get('type', 'unknown'), entity_data.get('name', '').lower())
     
-    def _determine_risk_level(self, sanctions_data: Dict[str, Any], web_data: Dict[str, Any]) -> str:
+    @staticmethod
+    def _determine_risk_level(sanctions_data: Dict[str, Any], web_data: Dict[str, Any]) -> str:
         """Determine risk level based on sanctions and web data"""
-        if sanctions_data.get('matched', False):
+        if sanctions_data.get('status') == 'check_failed':
+            return 'UNKNOWN'
+        if sanctions_data.get('matched'):
             return 'HIGH'
         
-        risk_indicators = web_data.get('risk_indicators', [])
-        if len(risk_indicators) > 2:
+        risk_indicators = web_data.get('risk_indicators')
+        if risk_indicators is not None and len(risk_indicators) > 2:
             return 'MEDIUM'
         
         return 'LOW'
     
     def close(self):
         """Close Neo4j connection"""
-        if hasattr(self, 'driver'):
+        self._write_executor.shutdown(wait=True)
+        if self.driver:
             self.driver.close()
             logger.info("Neo4j connection closed")
 
@@ -405,97 +685,107 @@ class Neo4jService:
                                    director_info: Dict[str, Any] = None) -> str:
         """Create director relationship between person and company"""
         try:
-            with self.driver.session() as session:
+            timestamp = int(time.time())
+            with self._session() as session:
                 # Create director node if director_info provided
                 if director_info:
-                    director_entity_id = f"director_{hashlib.md5(director_id.encode()).hexdigest()[:8]}"
+                    director_entity_id = f"director_{_short_hash(director_id)}"
                     
-                    session.run("""
-                        MERGE (d:Director:Person:Entity {id: $director_id})
-                        SET d.name = $name,
-                            d.director_id = $external_director_id,
-                            d.position = $position,
-                            d.appointment_date = $appointment_date,
-                            d.status = $status,
-                            d.type = 'director',
-                            d.updated_at = $timestamp
-                    """,
-                        director_id=director_entity_id,
-                        external_director_id=director_id,
-                        name=director_info.get('name', ''),
-                        position=director_info.get('position', 'Director'),
-                        appointment_date=director_info.get('appointment_date', ''),
-                        status=director_info.get('status', 'Active'),
-                        timestamp=int(time.time())
-                    )
+                    position = director_info.get('position', 'Director')
+                    appointment_date = director_info.get('appointment_date', '')
+                    status = director_info.get('status', 'Active')
                     
-                    # Create relationship between director and company
-                    session.run("""
-                        MATCH (d:Director {director_id: $director_id})
-                        MATCH (c:Company {id: $company_id})
-                        MERGE (d)-[r:DIRECTOR_OF]->(c)
-                        SET r.position = $position,
-                            r.appointment_date = $appointment_date,
-                            r.status = $status,
-                            r.created_at = $timestamp
-                    """,
-                        director_id=director_id,
-                        company_id=company_id,
-                        position=director_info.get('position', 'Director'),
-                        appointment_date=director_info.get('appointment_date', ''),
-                        status=director_info.get('status', 'Active'),
-                        timestamp=int(time.time())
-                    )
+                    # Create the director node and its company relationship in one transaction
+                    session.execute_write(self._write_director, {
+                        'director_id': director_entity_id,
+                        'external_director_id': director_id,
+                        'name': director_info.get('name', ''),
+                        'position': position,
+                        'appointment_date': appointment_date,
+                        'status': status,
+                        'timestamp': timestamp
+                    }, {
+                        'director_id': director_id,
+                        'company_id': company_id,
+                        'position': position,
+                        'appointment_date': appointment_date,
+                        'status': status,
+                        'timestamp': timestamp
+                    })
                     
                     return director_entity_id
                 else:
                     # Just create relationship if both entities exist
-                    result = session.run("""
-                        MATCH (p:Person {id: $director_id})
-                        MATCH (c:Company {id: $company_id})
-                        MERGE (p)-[r:DIRECTOR_OF]->(c)
-                        SET r.created_at = $timestamp
-                        RETURN r
-                    """,
-                        director_id=director_id,
-                        company_id=company_id,
-                        timestamp=int(time.time())
-                    )
+                    record = session.execute_write(_fetch_single, _Q_LINK_PERSON_DIRECTOR, {
+                        'director_id': director_id,
+                        'company_id': company_id,
+                        'timestamp': timestamp
+                    })
                     
-                    if result.single():
+                    if record:
                         return f"relationship_created_{director_id}_{company_id}"
                     else:
-                        logger.warning(f"Could not create director relationship - entities not found")
+                        logger.warning("Could not create director relationship - entities not found")
                         return None
                         
         except Exception as e:
-            logger.error(f"Failed to create director relationship: {str(e)}")
+            logger.error("Failed to create director relationship: %s", e)
             raise
 
+    def _write_director(self, tx, director_params: Dict[str, Any], link_params: Dict[str, Any]):
+        """Merge a director node and link it to its company"""
+        tx.run(_Q_MERGE_DIRECTOR, director_params).consume()
+        tx.run(_Q_LINK_DIRECTOR, link_params).consume()
+
+    def create_director_relationships_batch(self, company_id: str, directors: List[Dict[str, Any]]) -> Dict[str, str]:
+        """Create director nodes and their company relationships in one transaction"""
+        rows = {}
+        for director in directors:
+            director_id = director.get('director_id')
+            if director_id:
+                rows[director_id] = {
+                    'id': f"director_{_short_hash(director_id)}",
+                    'director_id': director_id,
+                    'name': director.get('name', ''),
+                    'position': director.get('position', 'Director'),
+                    'appointment_date': director.get('appointment_date', ''),
+                    'status': director.get('status', 'Active')
+                }
+        
+        if not rows:
+            return {}
+        
+        try:
+            with self._session() as session:
+                session.execute_write(self._write_directors, company_id, list(rows.values()), int(time.time()))
+            
+            director_entity_ids = {director_id: row['id'] for director_id, row in rows.items()}
+            return director_entity_ids
+        
+        except Exception as e:
+            logger.error("Failed to create director relationships: %s", e)
+            raise
+
+    def _write_directors(self, tx, company_id: str, rows: List[Dict[str, Any]], timestamp: int):
+        """Merge a batch of director nodes and link them to their company"""
+        tx.run(_Q_MERGE_DIRECTORS, rows=rows, timestamp=timestamp).consume()
+        tx.run(_Q_LINK_DIRECTORS, rows=rows, company_id=company_id, timestamp=timestamp).consume()
+
     def create_person_company_relationship(self, person_id: str, company_id: str, 
                                          relationship_type: str = "ASSOCIATED_WITH") -> bool:
             """Create relationship between person and company"""
             try:
-                query = """
-                MATCH (p:Entity {id: $person_id})
-                MATCH (c:Entity {id: $company_id})
-                MERGE (p)-[r:ASSOCIATED_WITH]->(c)
-                SET r.type = $relationship_type,
-                    r.created_at = $timestamp
-                RETURN r
-                """
-                
-                result = self._execute_query(query, {
+                result = self._execute_query(_Q_LINK_PERSON_COMPANY, {
                     'person_id': person_id,
                     'company_id': company_id,
                     'relationship_type': relationship_type,
                     'timestamp': int(time.time())
-                })
+                }, write=True)
                 
                 return bool(result)
                 
             except Exception as e:
-                logger.error(f"Failed to create person-company relationship: {str(e)}")
+                logger.error("Failed to create person-company relationship: %s", e)
                 return False
 
     def find_entity_relationships(self, entity_id: str) -> dict:
@@ -504,21 +794,12 @@ class Neo4jService:
             if not self.driver:
                 raise RisknetError("Neo4j driver not initialized")
 
-            with self.driver.session() as session:
+            with self._session() as session:
                 # Query to find all relationships
-                query = """
-                MATCH (e {id: $entity_id})-[r]-(related)
-                RETURN type(r) as relationship_type,
-                       e.name as entity_name,
-                       related.name as related_name,
-                       related.id as related_id,
-                       related.type as related_type
-                """
-                
-                result = session.run(query, entity_id=entity_id)
+                records = session.execute_read(_fetch_all, _Q_FIND_RELATIONSHIPS, {'entity_id': entity_id})
                 relationships = []
                 
-                for record in result:
+                for record in records:
                     relationship = {
                         'type': record['relationship_type'],
                         'entity_name': record['entity_name'],
@@ -535,9 +816,28 @@ class Neo4jService:
                 }
                 
         except Exception as e:
-            logging.error(f"Failed to find entity relationships: {str(e)}")
+            logging.error("Failed to find entity relationships: %s", e)
             return {
                 'created_relationships': [],
                 'director_relationships': [],
                 'entity_relationships': []
-            } 
\ No newline at end of file
+            } 
+
+_service_lock = threading.Lock()
+_service: Optional[Neo4jService] = None
+
+def get_neo4j_service() -> Neo4jService:
+    """Return the process-wide Neo4j service, connecting on first use"""
+    global _service
+    if _service is None:
+        with _service_lock:
+            if _service is None:
+                service = Neo4jService()
+                try:
+                    service._create_constraints()
+                except Exception:
+                    # Already logged; queries still work without the schema, only slower
+                    pass
+                atexit.register(service.close)
+                _service = service
+    return _service
@@ -1,3 +1,9 @@
-from .crime_models import CrimeDomain, CrimeStage, CRIME_DOMAINS, CRIME_STAGES
+from .crime_models import (
+    CrimeDomain, CrimeStage, CRIME_DOMAINS, CRIME_STAGES,
+    CRIME_DOMAIN_BY_CODE, CRIME_STAGE_BY_CODE, CRIME_DOMAINS_BY_PRIORITY
+)
 
-__all__ = ['CrimeDomain', 'CrimeStage', 'CRIME_DOMAINS', 'CRIME_STAGES'] 
\ No newline at end of file
+__all__ = [
+    'CrimeDomain', 'CrimeStage', 'CRIME_DOMAINS', 'CRIME_STAGES',
+    'CRIME_DOMAIN_BY_CODE', 'CRIME_STAGE_BY_CODE', 'CRIME_DOMAINS_BY_PRIORITY'
+] 
\ No newline at end of file
@@ -1,24 +1,27 @@
-from typing import List
+from typing import Dict, Tuple
 from dataclasses import dataclass
 
-@dataclass
+# __slots__ is declared by hand because dataclass(slots=True) needs Python 3.10
+@dataclass(frozen=True)
 class CrimeDomain:
     """Model representing a crime domain with its attributes"""
+    __slots__ = ('name', 'code', 'category', 'priority')
     name: str
     code: str
     category: str
     priority: str
 
-@dataclass
+@dataclass(frozen=True)
 class CrimeStage:
     """Model representing a crime stage with its attributes"""
+    __slots__ = ('name', 'code', 'description', 'stage')
     name: str
     code: str
     description: str
     stage: str
 
 # List of crime domains
-CRIME_DOMAINS: List[CrimeDomain] = [
+CRIME_DOMAINS: Tuple[CrimeDomain, ...] = (
     CrimeDomain("Firm Specific Black List", "BLK", "Regulatory Risks", "P0"),
     CrimeDomain("Bribery, Graft, Kickbacks", "BRB", "Fraud and Corruption", "P0"),
     CrimeDomain("Business Crimes", "BUS", "Fraud and Corruption", "P0"),
@@ -76,10 +79,10 @@ CRIME_DOMAINS: List[CrimeDomain] = [
     CrimeDomain("Arson", "ARS", "Social and Ethical Risks", "P3"),
     CrimeDomain("Virtual Currency", "VCY", "Cyber and Technology Risks", "P3"),
     CrimeDomain("Spying", "SPY", "Social and Ethical Risks", "P3"),
-]
+)
 
 # List of crime stages
-CRIME_STAGES: List[CrimeStage] = [
+CRIME_STAGES: Tuple[CrimeStage, ...] = (
     CrimeStage("Accuse", "ACC", "Stage 1: Pre-Investigation and Allegation", "Stage 1"),
     CrimeStage("Allege", "ALL", "Stage 1: Pre-Investigation and Allegation", "Stage 1"),
     CrimeStage("Conspire", "CSP", "Stage 1: Pre-Investigation and Allegation", "Stage 1"),
@@ -115,4 +118,12 @@ CRIME_STAGES: List[CrimeStage] = [
     CrimeStage("Revoked Registration", "RVK", "Stage 4: Administrative and Regulatory Actions", "Stage 3"),
     CrimeStage("Sanction", "SAN", "Stage 4: Administrative and Regulatory Actions", "Stage 3"),
     CrimeStage("Suspended", "SPD", "Stage 4: Administrative and Regulatory Actions", "Stage 3"),
-] 
\ No newline at end of file
+)
+
+# Lookup tables built once at import
+CRIME_DOMAIN_BY_CODE: Dict[str, CrimeDomain] = {domain.code: domain for domain in CRIME_DOMAINS}
+CRIME_STAGE_BY_CODE: Dict[str, CrimeStage] = {stage.code: stage for stage in CRIME_STAGES}
+CRIME_DOMAINS_BY_PRIORITY: Dict[str, Tuple[CrimeDomain, ...]] = {
+    priority: tuple(domain for domain in CRIME_DOMAINS if domain.priority == priority)
+    for priority in ('P0', 'P1', 'P2', 'P3')
+}
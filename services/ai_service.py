@@ -1,8 +1,10 @@
 import logging
-import json
-import requests
+import hashlib
+import orjson
 import os
-from typing import Dict, Any, List
+import concurrent.futures
+import threading
+from typing import Dict, Any, List, Optional, Tuple
 import time
 import re
 from config import (
@@ -11,22 +13,117 @@ from config import (
     MAX_KEY_FINDINGS, MAX_RISK_INDICATORS,
     ENABLE_FAST_MODE
 )
+from utils.cache import CacheManager
+from utils.http_client import create_http_session
+from utils.keyword_patterns import compile_keywords, compile_keyword_map
 
 logger = logging.getLogger(__name__)
 
+# Enhanced risk keywords mapping used by the rule-based fallback
+RISK_KEYWORDS_MAP = {
+    'sanctions': ('sanctions', 'ofac', 'sdn list', 'embargo', 'asset freeze'),
+    'criminal': ('criminal', 'fraud', 'embezzlement', 'money laundering', 'arrest', 'charge'),
+    'investigation': ('investigation', 'probe', 'inquiry', 'under investigation'),
+    'regulatory': ('regulatory violation', 'compliance violation', 'penalty', 'fine', 'settlement'),
+    'pep': ('politically exposed', 'pep', 'government official', 'political figure'),
+    'corruption': ('corruption', 'bribery', 'kickback', 'corrupt practices'),
+    'terrorism': ('terrorism', 'terrorist', 'terror financing')
+}
+
+RISK_CATEGORY_PATTERNS = compile_keyword_map(RISK_KEYWORDS_MAP)
+
+# Sentiment keywords scanned in the fallback's search results
+NEGATIVE_KEYWORDS_RE = re.compile('sanctions|investigation|criminal|fraud|violation|penalty')
+POSITIVE_KEYWORDS_RE = re.compile('compliant|cleared|exonerated|approved|legitimate')
+
+# Longest prefix ending in a sentence terminator; greedy, so one forward scan plus backtrack
+SENTENCE_PREFIX_RE = re.compile(r'.*[.!?]', re.DOTALL)
+
+OPENAI_URL = "https://api.openai.com/v1/chat/completions"
+DEEPSEEK_URL = "https://api.deepseek.com/v1/chat/completions"
+OPENAI_MODEL = "gpt-3.5-turbo" if ENABLE_FAST_MODE else "gpt-4"
+DEEPSEEK_MODEL = "deepseek-chat"
+# Models that accept response_format=json_object; the base gpt-4 model does not
+JSON_MODE_MODELS = frozenset({"gpt-3.5-turbo", "deepseek-chat"})
+# The JSON schema fits comfortably in this budget, free-form replies keep AI_MAX_TOKENS
+AI_JSON_MAX_TOKENS = int(os.getenv('AI_JSON_MAX_TOKENS', 400))
+
+# Everything static lives in the system prompt and comes first, so providers can reuse
+# the cached prompt prefix across requests; only the entity and its results vary
+ANALYST_SYSTEM_PROMPT = (
+    "You are a risk analyst specializing in sanctions, compliance, and entity due diligence. "
+    "Analyze the provided search results and provide a comprehensive risk assessment.\n\n"
+    "Respond with a JSON object with the keys: summary (string), risk_indicators (array of strings), "
+    "key_findings (array of strings), confidence (number from 0 to 1), sentiment (number from -1 to 1)"
+)
+ANALYSIS_PROMPT_TEMPLATE = "Entity: {entity_name} ({entity_type})\n\nSearch results:\n{results_text}"
+
+NON_WORD_RE = re.compile(r'\W+')
+
+# Per-result character caps applied when building the analysis prompt
+PROMPT_TITLE_CHARS = int(os.getenv('AI_PROMPT_TITLE_CHARS', 120))
+PROMPT_SNIPPET_CHARS = int(os.getenv('AI_PROMPT_SNIPPET_CHARS', 300))
+
+# Phrases looked for when an AI reply is prose rather than JSON
+RESPONSE_RISK_PATTERNS = (
+    ('sanctions', 'sanctions indicators'),
+    ('investigation', 'under investigation'),
+    ('criminal', 'criminal activity'),
+    ('terrorism', 'terrorism related'),
+    ('corruption', 'corruption allegations'),
+    ('money laundering', 'money laundering'),
+    ('financial crime', 'financial crimes')
+)
+RESPONSE_NEGATIVE_WORDS = ('negative', 'concern', 'risk', 'problem', 'issue', 'violation')
+RESPONSE_POSITIVE_WORDS = ('positive', 'clean', 'compliant', 'good', 'clear')
+
+RESPONSE_RISK_RE = compile_keywords(pattern for pattern, _ in RESPONSE_RISK_PATTERNS)
+RESPONSE_NEGATIVE_RE = compile_keywords(RESPONSE_NEGATIVE_WORDS)
+RESPONSE_POSITIVE_RE = compile_keywords(RESPONSE_POSITIVE_WORDS)
+
 class AIService:
     """AI service for intelligent risk analysis"""
     
-    def __init__(self):
+    def __init__(self, cache_manager: CacheManager = None, openai_concurrency: int = None, deepseek_concurrency: int = None):
         self.fast_mode = False
+        # Completed AI analyses are cached so repeat lookups skip the paid API call
+        self.cache_manager = cache_manager
+        self.cache_enabled = os.getenv('AI_CACHE_ENABLED', 'true').lower() == 'true'
+        self.cache_ttl = int(os.getenv('AI_CACHE_TTL', 86400))
         self.openai_api_key = os.getenv('OPENAI_API_KEY')
         self.deepseek_api_key = os.getenv('DEEPSEEK_API_KEY')
+        # Provider 429s and 5xx responses are retried with backoff before falling back
+        self.http = create_http_session(retries=int(os.getenv('AI_MAX_RETRIES', 3)))
+        # DeepSeek has slower latency episodes, so it gets a longer budget by default
+        self.openai_timeout = float(os.getenv('OPENAI_TIMEOUT', API_TIMEOUT))
+        self.deepseek_timeout = float(os.getenv('DEEPSEEK_TIMEOUT', API_TIMEOUT * 2))
+        self._openai_headers = {
+            'Authorization': f'Bearer {self.openai_api_key}',
+            'Content-Type': 'application/json'
+        }
+        self._deepseek_headers = {
+            'Authorization': f'Bearer {self.deepseek_api_key}',
+            'Content-Type': 'application/json'
+        }
+        # Cap in-flight requests per provider so bursts queue locally instead of hitting rate limits
+        self._openai_slots = threading.BoundedSemaphore(
+            openai_concurrency or int(os.getenv('OPENAI_CONCURRENCY', 8))
+        )
+        self._deepseek_slots = threading.BoundedSemaphore(
+            deepseek_concurrency or int(os.getenv('DEEPSEEK_CONCURRENCY', 8))
+        )
+        # 'sequential' tries providers one after another, 'parallel' queries them all at once
+        # and keeps the preferred answer, 'race' returns the first successful answer
+        self.provider_strategy = os.getenv('AI_PROVIDER_STRATEGY', 'sequential').lower()
+        # Analyses currently running, keyed by cache key, so concurrent duplicates share one API call
+        self._inflight: Dict[str, concurrent.futures.Future] = {}
+        self._inflight_lock = threading.Lock()
         logger.info("AI service initialized for intelligent analysis")
     
     def set_fast_mode(self, enabled: bool):
         """Set fast mode for optimized performance"""
         self.fast_mode = enabled
-        logger.info(f"AI service fast mode {'enabled' if enabled else 'disabled'}")
+        logger.info("AI service fast mode %s", 'enabled' if enabled else 'disabled')
     
     def summarize_search_results(self, search_results: List[Dict[str, Any]], entity_data: Dict[str, Any]) -> Dict[str, Any]:
         """Summarize search results using AI analysis"""
@@ -34,135 +131,241 @@ class AIService:
             if not search_results:
                 return self._create_fallback_summary([], entity_data)
             
-            entity_name = entity_data.get('name', 'Unknown')
-            entity_type = entity_data.get('type', 'unknown')
+            entity_name, entity_type = self._describe_entities(entity_data)
+            # Selected once; the cache key and the prompt are both built from these results
+            prompt_results = self._select_prompt_results(search_results)
             
-            # Try AI-powered analysis first
-            ai_summary = None
-            
-            # Try OpenAI
-            if self.openai_api_key:
-                ai_summary = self._analyze_with_openai(search_results, entity_name, entity_type)
+            cache_key = self._generate_cache_key(prompt_results, entity_data)
+            cached_summary = self._get_cached_summary(cache_key)
+            if cached_summary:
+                return cached_summary
             
-            # Try DeepSeek if OpenAI failed
-            if not ai_summary and self.deepseek_api_key:
-                ai_summary = self._analyze_with_deepseek(search_results, entity_name, entity_type)
+            # Try AI-powered analysis first
+            ai_summary = self._run_once(cache_key, prompt_results, entity_name, entity_type)
             
             # Fallback to rule-based analysis if no AI available
             if not ai_summary:
-                logger.info(f"No AI APIs available, using rule-based analysis for {entity_name}")
+                logger.info("No AI APIs available, using rule-based analysis for %s", entity_name)
                 return self._create_fallback_summary(search_results, entity_data)
             
-            return ai_summary
+            return dict(ai_summary)
             
         except Exception as e:
-            logger.error(f"AI analysis failed: {str(e)}")
+            logger.error("AI analysis failed: %s", e)
             return self._create_fallback_summary(search_results, entity_data)
     
-    def _analyze_with_openai(self, search_results: List[Dict[str, Any]], entity_name: str, entity_type: str) -> Dict[str, Any]:
-        """Analyze using OpenAI API"""
+    def _run_once(self, cache_key: str, prompt_results: List[Dict[str, Any]], entity_name: str, entity_type: str) -> Optional[Dict[str, Any]]:
+        """Run the providers once per cache key, letting concurrent duplicate requests wait on that call"""
+        with self._inflight_lock:
+            future = self._inflight.get(cache_key)
+            leader = future is None
+            if leader:
+                future = concurrent.futures.Future()
+                self._inflight[cache_key] = future
+        
+        if not leader:
+            logger.debug("Joining in-flight AI analysis for %s", entity_name)
+            return future.result()
+        
         try:
-            url = "https://api.openai.com/v1/chat/completions"
-            headers = {
-                'Authorization': f'Bearer {self.openai_api_key}',
-                'Content-Type': 'application/json'
-            }
-            
-            # Prepare search results text
-            results_text = self._format_results_for_ai(search_results)
-            
-            messages = [
-                {
-                    "role": "system",
-                    "content": "You are a risk analyst specializing in sanctions, compliance, and entity due diligence. Analyze the provided search results and provide a comprehensive risk assessment."
-                },
-                {
-                    "role": "user",
-                    "content": f"Analyze these search results for {entity_name} ({entity_type}) and provide a risk assessment:\n\n{results_text}\n\nProvide: 1) Summary 2) Risk indicators 3) Key findings 4) Confidence level (0-1) 5) Sentiment (-1 to 1)"
-                }
-            ]
+            ai_summary = self._run_providers(self._build_messages(prompt_results, entity_name, entity_type), entity_name)
+            if ai_summary and self.cache_manager and self.cache_enabled:
+                self.cache_manager.set(cache_key, ai_summary, ttl=self.cache_ttl)
+            future.set_result(ai_summary)
+            return ai_summary
+        except Exception as e:
+            future.set_exception(e)
+            raise
+        finally:
+            with self._inflight_lock:
+                self._inflight.pop(cache_key, None)
+    
+    @staticmethod
+    def _describe_entities(entity_data: Dict[str, Any]) -> Tuple[str, str]:
+        """Name the entity, or every entity when a person and company are assessed in one request"""
+        if 'name' in entity_data or not all(isinstance(value, dict) for value in entity_data.values()):
+            return entity_data.get('name', 'Unknown'), entity_data.get('type', 'unknown')
+        
+        # Multi-entity requests arrive keyed by role, e.g. {'person': {...}, 'company': {...}}
+        names = [entity.get('name', 'Unknown') for entity in entity_data.values()]
+        types = [entity.get('type', role) for role, entity in entity_data.items()]
+        if not names:
+            return 'Unknown', 'unknown'
+        return ' and '.join(names), ' and '.join(types)
+    
+    def _generate_cache_key(self, prompt_results: List[Dict[str, Any]], entity_data: Dict[str, Any]) -> str:
+        """Fingerprint the entity, the results the prompt is built from and the models used"""
+        fingerprint = orjson.dumps([
+            entity_data,
+            [(r.get('title'), r.get('snippet'), r.get('source')) for r in prompt_results],
+            OPENAI_MODEL,
+            DEEPSEEK_MODEL
+        ], default=str, option=orjson.OPT_SORT_KEYS | orjson.OPT_NON_STR_KEYS)
+        return f"ai_summary:{hashlib.blake2b(fingerprint, digest_size=16).hexdigest()}"
+    
+    def _get_cached_summary(self, cache_key: str) -> Optional[Dict[str, Any]]:
+        """Return a cached AI summary without the cache bookkeeping fields"""
+        if not self.cache_manager or not self.cache_enabled:
+            return None
+        
+        cached = self.cache_manager.get(cache_key)
+        if not cached:
+            return None
+        
+        for field in ('cached_at', 'cache_key', 'cache_ttl'):
+            cached.pop(field, None)
+        logger.debug("Using cached AI summary for key: %s", cache_key)
+        return cached
+    
+    def _run_providers(self, messages: List[Dict[str, str]], entity_name: str) -> Dict[str, Any]:
+        """Query the configured AI providers, returning the first usable analysis in preference order"""
+        providers = []
+        if self.openai_api_key:
+            providers.append(self._analyze_with_openai)
+        if self.deepseek_api_key:
+            providers.append(self._analyze_with_deepseek)
+        
+        if self.provider_strategy == 'race' and len(providers) > 1:
+            # Take whichever provider answers first; the slower call finishes in the background
+            executor = concurrent.futures.ThreadPoolExecutor(max_workers=len(providers))
+            try:
+                futures = [executor.submit(provider, messages, entity_name) for provider in providers]
+                for future in concurrent.futures.as_completed(futures):
+                    ai_summary = future.result()
+                    if ai_summary:
+                        return ai_summary
+                return None
+            finally:
+                executor.shutdown(wait=False)
+        
+        if self.provider_strategy == 'parallel' and len(providers) > 1:
+            # Overlap the provider round-trips; the fallback order is still honoured
+            with concurrent.futures.ThreadPoolExecutor(max_workers=len(providers)) as executor:
+                futures = [executor.submit(provider, messages, entity_name) for provider in providers]
             
-            payload = {
-                "model": "gpt-3.5-turbo" if ENABLE_FAST_MODE else "gpt-4",
-                "messages": messages,
-                "max_tokens": AI_MAX_TOKENS,
-                "temperature": AI_TEMPERATURE
-            }
+            for future in futures:
+                ai_summary = future.result()
+                if ai_summary:
+                    return ai_summary
+            return None
+        
+        for provider in providers:
+            ai_summary = provider(messages, entity_name)
+            if ai_summary:
+                return ai_summary
+        return None
+    
+    def _analyze_with_openai(self, messages: List[Dict[str, str]], entity_name: str) -> Dict[str, Any]:
+        """Analyze using OpenAI API"""
+        try:
+            payload = self._build_payload(OPENAI_MODEL, messages)
             
-            response = requests.post(url, headers=headers, json=payload, timeout=API_TIMEOUT)
+            with self._openai_slots:
+                response = self.http.post(OPENAI_URL, headers=self._openai_headers, data=orjson.dumps(payload), timeout=self.openai_timeout)
             
             if response.status_code == 200:
-                data = response.json()
+                data = orjson.loads(response.content)
                 content = data.get('choices', [{}])[0].get('message', {}).get('content', '')
                 return self._parse_ai_response(content, entity_name, 'OpenAI')
             else:
-                logger.warning(f"OpenAI API failed with status {response.status_code}")
+                logger.warning("OpenAI API failed with status %s", response.status_code)
                 return None
                 
         except Exception as e:
-            logger.error(f"OpenAI analysis failed: {str(e)}")
+            logger.error("OpenAI analysis failed: %s", e)
             return None
     
-    def _analyze_with_deepseek(self, search_results: List[Dict[str, Any]], entity_name: str, entity_type: str) -> Dict[str, Any]:
+    def _analyze_with_deepseek(self, messages: List[Dict[str, str]], entity_name: str) -> Dict[str, Any]:
         """Analyze using DeepSeek API"""
         try:
-            url = "https://api.deepseek.com/v1/chat/completions"
-            headers = {
-                'Authorization': f'Bearer {self.deepseek_api_key}',
-                'Content-Type': 'application/json'
-            }
-            
-            # Prepare search results text
-            results_text = self._format_results_for_ai(search_results)
+            payload = self._build_payload(DEEPSEEK_MODEL, messages)
             
-            messages = [
-                {
-                    "role": "system",
-                    "content": "You are a risk analyst specializing in sanctions, compliance, and entity due diligence. Analyze the provided search results and provide a comprehensive risk assessment."
-                },
-                {
-                    "role": "user",
-                    "content": f"Analyze these search results for {entity_name} ({entity_type}) and provide a risk assessment:\n\n{results_text}\n\nProvide: 1) Summary 2) Risk indicators 3) Key findings 4) Confidence level (0-1) 5) Sentiment (-1 to 1)"
-                }
-            ]
-            
-            payload = {
-                "model": "deepseek-chat",
-                "messages": messages,
-                "max_tokens": AI_MAX_TOKENS,
-                "temperature": AI_TEMPERATURE
-            }
-            
-            response = requests.post(url, headers=headers, json=payload, timeout=API_TIMEOUT)
+            with self._deepseek_slots:
+                response = self.http.post(DEEPSEEK_URL, headers=self._deepseek_headers, data=orjson.dumps(payload), timeout=self.deepseek_timeout)
             
             if response.status_code == 200:
-                data = response.json()
+                data = orjson.loads(response.content)
                 content = data.get('choices', [{}])[0].get('message', {}).get('content', '')
                 return self._parse_ai_response(content, entity_name, 'DeepSeek')
             else:
-                logger.warning(f"DeepSeek API failed with status {response.status_code}")
+                logger.warning("DeepSeek API failed with status %s", response.status_code)
                 return None
                 
         except Exception as e:
-            logger.error(f"DeepSeek analysis failed: {str(e)}")
+            logger.error("DeepSeek analysis failed: %s", e)
             return None
     
-    def _format_results_for_ai(self, search_results: List[Dict[str, Any]]) -> str:
-        """Format search results for AI analysis"""
+    def _build_messages(self, prompt_results: List[Dict[str, Any]], entity_name: str, entity_type: str) -> List[Dict[str, str]]:
+        """Build the chat messages once so every provider sends the same prompt"""
+        results_text = self._format_results_for_ai(prompt_results)
+        return [
+            {"role": "system", "content": ANALYST_SYSTEM_PROMPT},
+            {
+                "role": "user",
+                "content": ANALYSIS_PROMPT_TEMPLATE.format(
+                    entity_name=entity_name, entity_type=entity_type, results_text=results_text
+                )
+            }
+        ]
+    
+    @staticmethod
+    def _build_payload(model: str, messages: List[Dict[str, str]]) -> Dict[str, Any]:
+        """Build a chat completion request, asking for strict JSON where the model supports it"""
+        if model in JSON_MODE_MODELS:
+            return {
+                "model": model,
+                "messages": messages,
+                "max_tokens": AI_JSON_MAX_TOKENS,
+                "temperature": AI_TEMPERATURE,
+                "response_format": {"type": "json_object"}
+            }
+        return {
+            "model": model,
+            "messages": messages,
+            "max_tokens": AI_MAX_TOKENS,
+            "temperature": AI_TEMPERATURE
+        }
+    
+    @staticmethod
+    def _select_prompt_results(search_results: List[Dict[str, Any]], limit: int = 10) -> List[Dict[str, Any]]:
+        """Pick the top results for the prompt, skipping syndicated copies of the same text"""
+        selected = []
+        seen = set()
+        for result in search_results:
+            # Copies differ only in case, punctuation and whitespace once normalized
+            text = result.get('snippet') or result.get('title') or ''
+            key = NON_WORD_RE.sub(' ', text.lower()).strip()
+            if key:
+                if key in seen:
+                    continue
+                seen.add(key)
+            
+            selected.append(result)
+            if len(selected) == limit:
+                break
+        return selected
+    
+    def _format_results_for_ai(self, prompt_results: List[Dict[str, Any]]) -> str:
+        """Format the selected search results for AI analysis"""
         formatted_results = []
         
-        for i, result in enumerate(search_results[:10], 1):  # Limit to top 10 results
-            title = result.get('title', 'No title')
-            snippet = result.get('snippet', 'No description')
-            source = result.get('source', 'Unknown source')
-            date = result.get('date', 'Unknown date')
+        for i, result in enumerate(prompt_results, 1):
+            # Missing fields are left out rather than sent as placeholder tokens
+            line = f"{i}. {(result.get('title') or 'Untitled')[:PROMPT_TITLE_CHARS]}"
+            if result.get('source'):
+                line += f" | {result['source']}"
+            if result.get('date'):
+                line += f" | {result['date']}"
             
-            formatted_results.append(f"{i}. Title: {title}\n   Source: {source}\n   Date: {date}\n   Content: {snippet}\n")
+            snippet = (result.get('snippet') or '')[:PROMPT_SNIPPET_CHARS]
+            if snippet:
+                line += f"\n   {snippet}"
+            formatted_results.append(line)
         
         return "\n".join(formatted_results)
     
-    def _parse_ai_response(self, content: str, entity_name: str, ai_provider: str) -> Dict[str, Any]:
-        """Parse AI response into structured format"""
+    def _parse_ai_response(self, content: str, entity_name: str, ai_provider: str) -> Optional[Dict[str, Any]]:
+        """Parse AI response into structured format, or None when a JSON reply is unusable"""
         if not content:
             return {
                 'summary': f"AI analysis completed for {entity_name}",
@@ -173,9 +376,19 @@ class AIService:
                 'sources_cited': [],
                 'ai_provider': ai_provider
             }
+        
+        structured = self._parse_structured_response(content, ai_provider)
+        if structured:
+            return structured
+        
+        if self._strip_code_fence(content).startswith('{'):
+            # A JSON reply that does not parse was most likely cut off at max_tokens; treating
+            # it as prose would return the half-finished JSON text as the summary
+            logger.warning("Discarding truncated or malformed JSON reply from %s", ai_provider)
+            return None
 
         try:
-            # Extract risk indicators, key findings, etc. from the AI response
+            # Not valid JSON - extract risk indicators, key findings, etc. from the AI response
             risk_indicators = self._extract_risk_indicators_from_text(content)
             key_findings = self._extract_key_findings_from_text(content)
             confidence = self._extract_confidence_from_text(content)
@@ -184,25 +397,18 @@ class AIService:
             # Clean up the summary - avoid truncation mid-sentence
             summary = content
             if len(content) > 500:
-                # Find the last complete sentence within 500 characters
-                truncated = content[:500]
-                last_period = truncated.rfind('.')
-                last_exclamation = truncated.rfind('!')
-                last_question = truncated.rfind('?')
-                
-                # Find the last sentence ending
-                last_sentence_end = max(last_period, last_exclamation, last_question)
+                # Find the last complete sentence within 500 characters in a single scan
+                sentence_match = SENTENCE_PREFIX_RE.match(content, 0, 500)
                 
-                if last_sentence_end > 200:  # Ensure we have a reasonable amount of content
-                    summary = content[:last_sentence_end + 1]
+                if sentence_match and sentence_match.end() > 201:  # Ensure we have a reasonable amount of content
+                    summary = sentence_match.group()
                 else:
                     # If no good sentence break, truncate at last word boundary
-                    truncated = content[:500]
-                    last_space = truncated.rfind(' ')
-                    if last_space > 200:
+                    last_space = content.rfind(' ', 201, 500)
+                    if last_space != -1:
                         summary = content[:last_space] + "..."
                     else:
-                        summary = truncated + "..."
+                        summary = content[:500] + "..."
             
             return {
                 'summary': summary,
@@ -215,7 +421,7 @@ class AIService:
             }
             
         except Exception as e:
-            logger.error(f"Failed to parse AI response: {str(e)}")
+            logger.error("Failed to parse AI response: %s", e)
             return {
                 'summary': content[:500] if content else f"AI analysis completed for {entity_name}",
                 'risk_indicators': [],
@@ -226,27 +432,50 @@ class AIService:
                 'ai_provider': ai_provider
             }
     
-    def _extract_risk_indicators_from_text(self, text: str) -> List[str]:
-        """Extract risk indicators from AI response text"""
-        risk_indicators = []
-        text_lower = text.lower()
+    @staticmethod
+    def _strip_code_fence(content: str) -> str:
+        """Return the reply text, unwrapped from a markdown code fence if the model added one"""
+        text = content.strip()
+        if text.startswith('```'):
+            text = text.strip('`')
+            if text.startswith('json'):
+                text = text[4:]
+            text = text.strip()
+        return text
+    
+    def _parse_structured_response(self, content: str, ai_provider: str) -> Optional[Dict[str, Any]]:
+        """Parse a JSON analysis reply, returning None when the model answered in prose"""
+        try:
+            data = orjson.loads(self._strip_code_fence(content))
+        except ValueError:
+            return None
         
-        # Look for common risk patterns in the AI response
-        risk_patterns = {
-            'sanctions': 'sanctions indicators',
-            'investigation': 'under investigation',
-            'criminal': 'criminal activity',
-            'terrorism': 'terrorism related',
-            'corruption': 'corruption allegations',
-            'money laundering': 'money laundering',
-            'financial crime': 'financial crimes'
-        }
+        if not isinstance(data, dict) or not isinstance(data.get('summary'), str):
+            return None
         
-        for pattern, indicator in risk_patterns.items():
-            if pattern in text_lower:
-                risk_indicators.append(indicator)
+        try:
+            confidence = min(max(float(data.get('confidence', 0.5)), 0.0), 1.0)
+            sentiment = min(max(float(data.get('sentiment', 0.0)), -1.0), 1.0)
+        except (TypeError, ValueError):
+            confidence, sentiment = 0.5, 0.0
         
-        return risk_indicators
+        risk_indicators = data.get('risk_indicators')
+        key_findings = data.get('key_findings')
+        return {
+            'summary': data['summary'],
+            'risk_indicators': [str(item) for item in risk_indicators][:MAX_RISK_INDICATORS] if isinstance(risk_indicators, list) else [],
+            'sentiment': sentiment,
+            'confidence': confidence,
+            'key_findings': [str(item) for item in key_findings][:MAX_KEY_FINDINGS] if isinstance(key_findings, list) else [],
+            'sources_cited': [],
+            'ai_provider': ai_provider
+        }
+    
+    def _extract_risk_indicators_from_text(self, text: str) -> List[str]:
+        """Extract risk indicators from AI response text"""
+        # Look for common risk patterns in the AI response, reported in pattern order
+        found = set(RESPONSE_RISK_RE.findall(text.lower()))
+        return [indicator for pattern, indicator in RESPONSE_RISK_PATTERNS if pattern in found]
     
     def _extract_key_findings_from_text(self, text: str) -> List[str]:
         """Extract key findings from AI response"""
@@ -291,11 +520,8 @@ class AIService:
         text_lower = text.lower()
         
         # Look for sentiment indicators
-        negative_words = ['negative', 'concern', 'risk', 'problem', 'issue', 'violation']
-        positive_words = ['positive', 'clean', 'compliant', 'good', 'clear']
-        
-        negative_count = sum(1 for word in negative_words if word in text_lower)
-        positive_count = sum(1 for word in positive_words if word in text_lower)
+        negative_count = len(set(RESPONSE_NEGATIVE_RE.findall(text_lower)))
+        positive_count = len(set(RESPONSE_POSITIVE_RE.findall(text_lower)))
         
         if negative_count > positive_count:
             return -0.5
@@ -306,38 +532,33 @@ class AIService:
     
     def _create_fallback_summary(self, search_results: List[Dict], entity_data: Dict[str, Any]) -> Dict[str, Any]:
         """Create fallback summary using rule-based analysis"""
-        entity_name = entity_data.get('name', 'Unknown')
-        risk_indicators = []
+        entity_name, _ = self._describe_entities(entity_data)
+        # Dicts double as insertion-ordered sets for constant-time de-duplication
+        risk_indicators = {}
         key_findings = []
-        sources_cited = []
-        
-        # Enhanced risk keywords mapping
-        risk_keywords_map = {
-            'sanctions': ['sanctions', 'ofac', 'sdn list', 'embargo', 'asset freeze'],
-            'criminal': ['criminal', 'fraud', 'embezzlement', 'money laundering', 'arrest', 'charge'],
-            'investigation': ['investigation', 'probe', 'inquiry', 'under investigation'],
-            'regulatory': ['regulatory violation', 'compliance violation', 'penalty', 'fine', 'settlement'],
-            'pep': ['politically exposed', 'pep', 'government official', 'political figure'],
-            'corruption': ['corruption', 'bribery', 'kickback', 'corrupt practices'],
-            'terrorism': ['terrorism', 'terrorist', 'terror financing']
-        }
+        sources_cited = {}
+        negative_count = 0
+        positive_count = 0
         
-        # Analyze results for risk indicators
+        # Analyze results for risk indicators and sentiment in a single pass
         for result in search_results:
             text = f"{result.get('title', '')} {result.get('snippet', '')}".lower()
             source = result.get('source', '')
             
+            # Each distinct keyword counts once per result
+            negative_count += len(set(NEGATIVE_KEYWORDS_RE.findall(text)))
+            positive_count += len(set(POSITIVE_KEYWORDS_RE.findall(text)))
+            
             if source:
-                sources_cited.append(source)
+                sources_cited[source] = None
             
-            for category, keywords in risk_keywords_map.items():
-                if any(keyword in text for keyword in keywords):
-                    indicator = f"{category.title()} related activity"
-                    if indicator not in risk_indicators:
-                        risk_indicators.append(indicator)
+            for category, pattern in RISK_CATEGORY_PATTERNS.items():
+                if pattern.search(text):
+                    risk_indicators[f"{category.title()} related activity"] = None
                     key_findings.append(f"Found {category} related information in {source}")
         
         # Generate summary
+        risk_indicators = list(risk_indicators)
         if risk_indicators:
             summary = f"Analysis of {entity_name} indicates the following risk factors: " + ", ".join(risk_indicators[:3])
         else:
@@ -347,7 +568,8 @@ class AIService:
         confidence = min(0.8, len(search_results) * 0.1) if search_results else 0.1
         
         # Calculate sentiment
-        sentiment = self._calculate_sentiment_from_results(search_results)
+        total = negative_count + positive_count
+        sentiment = (positive_count - negative_count) / total if total else 0.0
         
         return {
             'summary': summary,
@@ -355,34 +577,6 @@ class AIService:
             'sentiment': sentiment,
             'confidence': confidence,
             'key_findings': key_findings[:MAX_KEY_FINDINGS],
-            'sources_cited': list(set(sources_cited))[:MAX_RISK_INDICATORS],
+            'sources_cited': list(sources_cited)[:MAX_RISK_INDICATORS],
             'ai_provider': 'Rule-based Analysis'
-        }
-    
-    def _calculate_sentiment_from_results(self, search_results: List[Dict[str, Any]]) -> float:
-        """Calculate sentiment from search results"""
-        if not search_results:
-            return 0.0
-        
-        negative_keywords = ['sanctions', 'investigation', 'criminal', 'fraud', 'violation', 'penalty']
-        positive_keywords = ['compliant', 'cleared', 'exonerated', 'approved', 'legitimate']
-        
-        negative_count = 0
-        positive_count = 0
-        
-        for result in search_results:
-            text = f"{result.get('title', '')} {result.get('snippet', '')}".lower()
-            
-            for keyword in negative_keywords:
-                if keyword in text:
-                    negative_count += 1
-            
-            for keyword in positive_keywords:
-                if keyword in text:
-                    positive_count += 1
-        
-        total = negative_count + positive_count
-        if total == 0:
-            return 0.0
-        
-        return (positive_count - negative_count) / total 
\ No newline at end of file
+        }
\ No newline at end of file
@@ -1,10 +1,10 @@
 import logging
-import requests
 from typing import Dict, List, Any, Optional
 from fuzzywuzzy import fuzz
-import json
+import orjson
 import time
 import os
+from utils.http_client import create_http_session
 
 logger = logging.getLogger(__name__)
 
@@ -16,6 +16,8 @@ class OpenSanctionsService:
         self.api_base_url = "https://api.opensanctions.org"
         self.sanctions_data = []
         self.data_loaded = False
+        # Pooled keep-alive connections to the OpenSanctions API
+        self.http = create_http_session()
         self._load_sanctions_data()
 
     def _load_sanctions_data(self):
@@ -35,7 +37,7 @@ class OpenSanctionsService:
             }
             
             # Test connection first
-            response = requests.get(test_url, headers=headers, timeout=10)
+            response = self.http.get(test_url, headers=headers, timeout=10)
             
             if response.status_code == 200:
                 logger.info("Successfully connected to OpenSanctions API")
@@ -45,10 +47,10 @@ class OpenSanctionsService:
                 logger.info("OpenSanctions service initialized with real API access")
                 return
             else:
-                logger.warning(f"OpenSanctions API returned status {response.status_code}")
+                logger.warning("OpenSanctions API returned status %s", response.status_code)
                 
         except Exception as e:
-            logger.warning(f"Failed to connect to real OpenSanctions API: {str(e)}")
+            logger.warning("Failed to connect to real OpenSanctions API: %s", e)
         
         # Fallback to empty dataset
         logger.info("Using empty dataset - will perform live API searches")
@@ -71,19 +73,19 @@ class OpenSanctionsService:
                 'Accept': 'application/json'
             }
             
-            response = requests.get(search_url, params=params, headers=headers, timeout=15)
+            response = self.http.get(search_url, params=params, headers=headers, timeout=15)
             
             if response.status_code == 200:
-                data = response.json()
+                data = orjson.loads(response.content)
                 results = data.get('results', [])
-                logger.info(f"Found {len(results)} results from OpenSanctions API for '{entity_name}'")
+                logger.info("Found %s results from OpenSanctions API for '%s'", len(results), entity_name)
                 return results
             else:
-                logger.warning(f"OpenSanctions API search failed with status {response.status_code}")
+                logger.warning("OpenSanctions API search failed with status %s", response.status_code)
                 return []
                 
         except Exception as e:
-            logger.error(f"Error searching OpenSanctions API: {str(e)}")
+            logger.error("Error searching OpenSanctions API: %s", e)
             return []
 
     def _is_relevant_entity(self, entity: Dict) -> bool:
@@ -198,7 +200,7 @@ class OpenSanctionsService:
             }
             
         except Exception as e:
-            logger.error(f"Error processing API result: {str(e)}")
+            logger.error("Error processing API result: %s", e)
             return None
     
     def _check_name_match(self, search_name: str, sanctions_entity: Dict, entity_data: Dict) -> Optional[Dict[str, Any]]:
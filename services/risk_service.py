@@ -7,36 +7,37 @@ from typing import Dict, Any, List
 from services.opensanctions_service import OpenSanctionsService
 from services.web_search_service import WebSearchService
 from services.ai_service import AIService
-from graph.neo4j_service import Neo4jService
+from graph.neo4j_service import get_neo4j_service
 from utils.cache import CacheManager
+from utils.errors import RisknetError
 from datetime import datetime
 import os
 
 logger = logging.getLogger(__name__)
 
-class RisknetError(Exception):
-    """Custom exception for Risknet service errors."""
-    pass
+# Overall budget for the parallel sanctions and web lookups of one assessment, so retries
+# and backoff in the HTTP clients cannot pin a request thread indefinitely
+RISK_ASSESSMENT_TIMEOUT = float(os.getenv('RISK_ASSESSMENT_TIMEOUT', 45))
 
 class RiskService:
     """Service for risk assessment"""
     
-    def __init__(self):
-        """Initialize risk service"""
+    def __init__(self, cache_manager: CacheManager = None):
+        """Initialize risk service, optionally sharing the caller's cache manager"""
+        self.cache_manager = cache_manager or CacheManager()
         self.opensanctions_service = OpenSanctionsService()
         self.web_search_service = WebSearchService()
-        self.ai_service = AIService()
+        self.ai_service = AIService(cache_manager=self.cache_manager)
         
         # Initialize Neo4j service with error handling
         try:
-            self.neo4j_service = Neo4jService()
+            self.neo4j_service = get_neo4j_service()
             self.neo4j_available = True
         except Exception as e:
-            logger.warning(f"Neo4j service initialization failed: {str(e)}")
+            logger.warning("Neo4j service initialization failed: %s", e)
             self.neo4j_available = False
             self.neo4j_service = None
         
-        self.cache_manager = CacheManager()
         self.fast_mode = False
         
         # Initialize available APIs
@@ -48,7 +49,7 @@ class RiskService:
             'neo4j': self.neo4j_available
         }
         
-        logger.info(f"Risk service initialized with available APIs: {self.available_apis}")
+        logger.info("Risk service initialized with available APIs: %s", self.available_apis)
     
     def assess_risk(self, validated_data: Dict[str, Any]) -> Dict[str, Any]:
         """Comprehensive risk assessment with flexible person/company input handling"""
@@ -61,24 +62,24 @@ class RiskService:
             cached_result = self.cache_manager.get(cache_key)
             if cached_result:
                 entity_name = self._get_primary_entity_name(validated_data)
-                logger.info(f"Cache hit for {input_type}: {entity_name}")
+                logger.info("Cache hit for %s: %s", input_type, entity_name)
                 return cached_result
             
             entity_name = self._get_primary_entity_name(validated_data)
-            logger.info(f"Starting comprehensive {input_type} risk assessment for: {entity_name}")
+            logger.info("Starting comprehensive %s risk assessment for: %s", input_type, entity_name)
             
             # Create search strategy based on input type
             search_entities = self._prepare_search_entities(validated_data)
             
-            # OPTIMIZATION: Use parallel processing for multiple entities
-            if len(search_entities) > 1 and self.fast_mode:
+            # OPTIMIZATION: Person and company pipelines are independent I/O, so always overlap them
+            if len(search_entities) > 1:
                 logger.info("Using parallel processing for multiple entities")
                 return self._assess_risk_parallel(validated_data, search_entities, start_time)
             else:
                 return self._assess_risk_sequential(validated_data, search_entities, start_time)
             
         except Exception as e:
-            logger.error(f"Risk assessment failed: {str(e)}")
+            logger.error("Risk assessment failed: %s", e)
             raise RisknetError(f"Risk assessment failed: {str(e)}")
     
     def _assess_risk_parallel(self, validated_data: Dict[str, Any], search_entities: Dict[str, Dict[str, Any]], start_time: float) -> Dict[str, Any]:
@@ -86,8 +87,9 @@ class RiskService:
         input_type = validated_data.get('input_type', 'unknown')
         
         # Use ThreadPoolExecutor for I/O bound operations (API calls)
-        with concurrent.futures.ThreadPoolExecutor(max_workers=4) as executor:
-            
+        deadline = time.perf_counter() + RISK_ASSESSMENT_TIMEOUT
+        executor = concurrent.futures.ThreadPoolExecutor(max_workers=4)
+        try:
             # Step 1: Parallel sanctions checks
             logger.info("Parallel sanctions checks...")
             sanctions_futures = {
@@ -106,56 +108,60 @@ class RiskService:
             sanctions_results = {}
             web_intelligence_results = {}
             
-            # Wait for sanctions checks (usually faster)
+            # Wait for sanctions checks (usually faster), bounded by the assessment deadline
             for entity_key, future in sanctions_futures.items():
                 try:
-                    sanctions_results[entity_key] = future.result(timeout=10)
+                    sanctions_results[entity_key] = future.result(timeout=max(0, deadline - time.perf_counter()))
+                except concurrent.futures.TimeoutError:
+                    logger.error("Sanctions check timed out for %s", entity_key)
+                    sanctions_results[entity_key] = self._failed_sanctions_check(
+                        TimeoutError(f"no result within {RISK_ASSESSMENT_TIMEOUT}s")
+                    )
                 except Exception as e:
-                    logger.error(f"Sanctions check failed for {entity_key}: {e}")
-                    sanctions_results[entity_key] = {'matches': [], 'total_matches': 0, 'matched': False, 'risk_score': 0}
+                    logger.error("Sanctions check failed for %s: %s", entity_key, e)
+                    sanctions_results[entity_key] = self._failed_sanctions_check(e)
             
             # Wait for web intelligence results
             for entity_key, future in web_futures.items():
                 try:
-                    web_intelligence_results[entity_key] = future.result(timeout=30)
+                    web_intelligence_results[entity_key] = future.result(timeout=max(0, deadline - time.perf_counter()))
+                except concurrent.futures.TimeoutError:
+                    logger.error("Web intelligence timed out for %s", entity_key)
+                    web_intelligence_results[entity_key] = {'results': [], 'total_results': 0, 'risk_score': 0}
                 except Exception as e:
-                    logger.error(f"Web intelligence failed for {entity_key}: {e}")
+                    logger.error("Web intelligence failed for %s: %s", entity_key, e)
                     web_intelligence_results[entity_key] = {'results': [], 'total_results': 0, 'risk_score': 0}
+        finally:
+            # Do not wait for lookups that missed the deadline; they finish in the background
+            executor.shutdown(wait=False)
+        
+        # Step 3: AI analysis
+        logger.info("Performing AI analysis...")
+        all_web_results = []
+        for results in web_intelligence_results.values():
+            all_web_results.extend(results.get('results', []))
+        
+        ai_summary = self.ai_service.summarize_search_results(all_web_results, search_entities)
+        
+        # Step 4: Graph analysis and entity relationship handling
+        logger.info("Analyzing entity connections...")
+        entity_ids = []
+        relationship_analysis = {'created_relationships': [], 'director_relationships': [], 'entity_relationships': []}
+        
+        if self.neo4j_available:
+            # Create or update entities in Neo4j
+            entity_ids = self._upsert_entities(search_entities, sanctions_results, web_intelligence_results)
             
-            # Step 3: AI analysis
-            logger.info("Performing AI analysis...")
-            all_web_results = []
-            for results in web_intelligence_results.values():
-                all_web_results.extend(results.get('results', []))
-            
-            ai_summary = self.ai_service.summarize_search_results(all_web_results, search_entities)
-            
-            # Step 4: Graph analysis and entity relationship handling
-            logger.info("Analyzing entity connections...")
-            entity_ids = []
-            relationship_analysis = {'created_relationships': [], 'director_relationships': [], 'entity_relationships': []}
-            
-            if self.neo4j_available:
-                # Create or update entities in Neo4j
-                for entity_key, entity_data in search_entities.items():
-                    try:
-                        sanctions_data = sanctions_results.get(entity_key, {})
-                        web_data = web_intelligence_results.get(entity_key, {})
-                        entity_id = self.neo4j_service.create_or_update_entity(entity_data, sanctions_data, web_data)
-                        entity_ids.append(entity_id)
-                    except Exception as e:
-                        logger.error(f"Failed to create entity in Neo4j: {e}")
-                
-                # Handle entity relationships
-                relationship_analysis = self._handle_entity_relationships(validated_data, entity_ids)
-            
-            # Step 5: Calculate overall risk
-            logger.info("Calculating final risk score...")
-            risk_calculation = self._calculate_risk_score(sanctions_results, web_intelligence_results, ai_summary, relationship_analysis)
-            
-            # Build final response
-            return self._build_final_response(validated_data, sanctions_results, web_intelligence_results, 
-                                            ai_summary, {}, risk_calculation, entity_ids, start_time, relationship_analysis)
+            # Handle entity relationships
+            relationship_analysis = self._handle_entity_relationships(validated_data, entity_ids)
+        
+        # Step 5: Calculate overall risk
+        logger.info("Calculating final risk score...")
+        risk_calculation = self._calculate_risk_score(sanctions_results, web_intelligence_results, ai_summary, relationship_analysis)
+        
+        # Build final response
+        return self._build_final_response(validated_data, sanctions_results, web_intelligence_results, 
+                                        ai_summary, {}, risk_calculation, entity_ids, start_time, relationship_analysis)
     
     def _assess_risk_sequential(self, validated_data: Dict[str, Any], search_entities: Dict[str, Dict[str, Any]], start_time: float) -> Dict[str, Any]:
         """Sequential processing for single entity or when parallel processing is disabled"""
@@ -168,8 +174,8 @@ class RiskService:
             try:
                 sanctions_results[entity_key] = self.opensanctions_service.check_entity(entity_data)
             except Exception as e:
-                logger.error(f"Sanctions check failed for {entity_key}: {e}")
-                sanctions_results[entity_key] = {'matches': [], 'total_matches': 0, 'matched': False, 'risk_score': 0}
+                logger.error("Sanctions check failed for %s: %s", entity_key, e)
+                sanctions_results[entity_key] = self._failed_sanctions_check(e)
         
         # Step 2: Web intelligence gathering
         logger.info("Gathering web intelligence...")
@@ -178,7 +184,7 @@ class RiskService:
             try:
                 web_intelligence_results[entity_key] = self.web_search_service.search_entity(entity_data)
             except Exception as e:
-                logger.error(f"Web intelligence failed for {entity_key}: {e}")
+                logger.error("Web intelligence failed for %s: %s", entity_key, e)
                 web_intelligence_results[entity_key] = {'results': [], 'total_results': 0, 'risk_score': 0}
         
         # Step 3: AI-powered analysis
@@ -187,11 +193,7 @@ class RiskService:
         for results in web_intelligence_results.values():
             all_web_results.extend(results.get('results', []))
         
-        try:
-            ai_summary = self.ai_service.summarize_search_results(all_web_results, search_entities)
-        except Exception as e:
-            logger.error(f"AI analysis failed: {e}")
-            ai_summary = {'summary': 'AI analysis failed', 'risk_score': 0, 'confidence': 0}
+        ai_summary = self.ai_service.summarize_search_results(all_web_results, search_entities)
         
         # Step 4: Graph analysis and entity relationship handling
         logger.info("Analyzing entity connections...")
@@ -200,14 +202,7 @@ class RiskService:
         
         if self.neo4j_available:
             # Create or update entities in Neo4j
-            for entity_key, entity_data in search_entities.items():
-                try:
-                    sanctions_data = sanctions_results.get(entity_key, {})
-                    web_data = web_intelligence_results.get(entity_key, {})
-                    entity_id = self.neo4j_service.create_or_update_entity(entity_data, sanctions_data, web_data)
-                    entity_ids.append(entity_id)
-                except Exception as e:
-                    logger.error(f"Failed to create entity in Neo4j: {e}")
+            entity_ids = self._upsert_entities(search_entities, sanctions_results, web_intelligence_results)
             
             # Handle entity relationships
             relationship_analysis = self._handle_entity_relationships(validated_data, entity_ids)
@@ -220,10 +215,30 @@ class RiskService:
         return self._build_final_response(validated_data, sanctions_results, web_intelligence_results, 
                                         ai_summary, {}, risk_calculation, entity_ids, start_time, relationship_analysis)
     
+    @staticmethod
+    def _failed_sanctions_check(error: Exception) -> Dict[str, Any]:
+        """Record a sanctions check that did not complete, so it is never read as a clean result"""
+        return {
+            'matches': [],
+            'total_matches': 0,
+            'risk_score': 0,
+            'status': 'check_failed',
+            'error': str(error)
+        }
+    
+    def _upsert_entities(self, search_entities: Dict[str, Dict[str, Any]], sanctions_results: Dict[str, Any],
+                         web_intelligence_results: Dict[str, Any]) -> List[str]:
+        """Write all searched entities to Neo4j concurrently, returning the IDs that were stored"""
+        entity_ids = self.neo4j_service.create_or_update_entities([
+            (entity_data, sanctions_results.get(entity_key, {}), web_intelligence_results.get(entity_key, {}))
+            for entity_key, entity_data in search_entities.items()
+        ])
+        return [entity_id for entity_id in entity_ids if entity_id]
+    
     def _calculate_risk_score(self, sanctions_results, web_results, ai_results, relationship_results):
         """Calculate the final risk score based on all available data sources."""
         try:
-            logger.debug(f"Calculating risk score with: sanctions={type(sanctions_results)}, web={type(web_results)}, ai={type(ai_results)}, relationships={type(relationship_results)}")
+            logger.debug("Calculating risk score with: sanctions=%s, web=%s, ai=%s, relationships=%s", type(sanctions_results), type(web_results), type(ai_results), type(relationship_results))
             
             # Helper function to safely aggregate scores from dict of dicts
             def aggregate_scores(results, score_key='risk_score', default=0):
@@ -307,15 +322,24 @@ class RiskService:
             risk_score = min(max(round(final_score), 0), 100)
             risk_level = self._get_risk_level(risk_score)
             
+            # Without a completed sanctions check the entity cannot be reported as low risk
+            sanctions_check_failed = isinstance(sanctions_results, dict) and any(
+                isinstance(result, dict) and result.get('status') == 'check_failed'
+                for result in sanctions_results.values()
+            )
+            if sanctions_check_failed:
+                risk_level = 'unknown'
+            
             # Collect risk factors
             risk_factors = self._collect_risk_factors(sanctions_results, web_results, ai_results, relationship_results)
             
-            logger.debug(f"Calculated risk score: {risk_score}, level: {risk_level}")
+            logger.debug("Calculated risk score: %s, level: %s", risk_score, risk_level)
             
             return {
                 'risk_score': risk_score,
                 'risk_level': risk_level,
                 'risk_factors': risk_factors,
+                'sanctions_check_failed': sanctions_check_failed,
                 'component_scores': {
                     'sanctions': sanctions_score,
                     'web_intelligence': web_score,
@@ -325,7 +349,7 @@ class RiskService:
             }
             
         except Exception as e:
-            logger.error(f"Error calculating risk score: {str(e)}")
+            logger.error("Error calculating risk score: %s", e)
             return {
                 'risk_score': 0,
                 'risk_level': 'unknown',
@@ -348,6 +372,14 @@ class RiskService:
             if isinstance(sanctions_results, dict):
                 for entity_key, result in sanctions_results.items():
                     if isinstance(result, dict):
+                        if result.get('status') == 'check_failed':
+                            risk_factors.append({
+                                'source': 'sanctions',
+                                'type': 'sanctions_check_failed',
+                                'description': f"Sanctions check could not be completed for {entity_key}",
+                                'confidence': 0.0,
+                                'severity': 'high'
+                            })
                         for match in result.get('matches', []):
                             risk_factors.append({
                                 'source': 'sanctions',
@@ -394,7 +426,7 @@ class RiskService:
                     })
         
         except Exception as e:
-            logger.error(f"Error collecting risk factors: {str(e)}")
+            logger.error("Error collecting risk factors: %s", e)
             risk_factors.append({
                 'source': 'system',
                 'type': 'processing_error',
@@ -447,23 +479,24 @@ class RiskService:
                 if company_id:
                     # Handle directors list
                     directors = company_data.get('directors', [])
-                    for director in directors:
-                        director_id = director.get('director_id')
-                        if director_id:
-                            try:
-                                result = self.neo4j_service.create_director_relationship(
-                                    director_id, company_id, director
-                                )
-                                if result:
+                    if directors:
+                        try:
+                            # All directors are written in a single batched transaction
+                            director_entity_ids = self.neo4j_service.create_director_relationships_batch(
+                                company_id, directors
+                            )
+                            for director in directors:
+                                director_id = director.get('director_id')
+                                if director_id in director_entity_ids:
                                     relationship_analysis['director_relationships'].append({
                                         'director_id': director_id,
                                         'company_id': company_id,
                                         'director_name': director.get('name', ''),
                                         'position': director.get('position', 'Director'),
-                                        'relationship_id': result
+                                        'relationship_id': director_entity_ids[director_id]
                                     })
-                            except Exception as e:
-                                logger.error(f"Failed to create director relationship: {e}")
+                        except Exception as e:
+                            logger.error("Failed to create director relationships: %s", e)
                     
                     # Handle single director_id (backward compatibility)
                     director_id = company_data.get('director_id')
@@ -479,7 +512,7 @@ class RiskService:
                                     'relationship_id': result
                                 })
                         except Exception as e:
-                            logger.error(f"Failed to create director relationship: {e}")
+                            logger.error("Failed to create director relationship: %s", e)
             
             # Analyze existing relationships for all entities
             for entity_id in entity_ids:
@@ -487,14 +520,14 @@ class RiskService:
                     entity_relationships = self.neo4j_service.find_entity_relationships(entity_id)
                     relationship_analysis['entity_associations'][entity_id] = entity_relationships
                 except Exception as e:
-                    logger.error(f"Failed to analyze relationships for {entity_id}: {e}")
+                    logger.error("Failed to analyze relationships for %s: %s", entity_id, e)
                     relationship_analysis['entity_associations'][entity_id] = {
                         'entity_found': False,
                         'error': str(e)
                     }
         
         except Exception as e:
-            logger.error(f"Error handling entity relationships: {e}")
+            logger.error("Error handling entity relationships: %s", e)
             relationship_analysis['error'] = str(e)
         
         return relationship_analysis
@@ -514,7 +547,7 @@ class RiskService:
             'risk_level': risk_calculation['risk_level'],
             'assessment_timestamp': int(time.time()),
             'processing_time_ms': processing_time,
-            'performance_mode': 'parallel' if len(validated_data.get('person', {}).get('name', '') + validated_data.get('company', {}).get('name', '')) > 1 and self.fast_mode else 'sequential',
+            'performance_mode': 'parallel' if validated_data.get('person') and validated_data.get('company') else 'sequential',
             'sanctions_check': self._build_sanctions_response(sanctions_results),
             'web_intelligence': self._build_web_intelligence_response(web_intelligence_results),
             'ai_summary': {
@@ -554,12 +587,13 @@ class RiskService:
                     validated_data.get('company'), relationship_analysis['director_relationships']
                 )
         
-        # Cache the result
-        cache_key = self._generate_cache_key(validated_data)
-        self.cache_manager.set(cache_key, comprehensive_result)
+        # Cache the result, unless a failed sanctions check would be served again as final
+        if not risk_calculation.get('sanctions_check_failed'):
+            cache_key = self._generate_cache_key(validated_data)
+            self.cache_manager.set(cache_key, comprehensive_result)
         
         entity_name = self._get_primary_entity_name(validated_data)
-        logger.info(f"Risk assessment completed in {processing_time}ms for {input_type}: {entity_name}")
+        logger.info("Risk assessment completed in %sms for %s: %s", processing_time, input_type, entity_name)
         return comprehensive_result
 
     def _get_comprehensive_graph_data(self, entity_ids: List[str]) -> Dict[str, Any]:
@@ -577,7 +611,7 @@ class RiskService:
             # Get detailed entity data from Neo4j
             return self.neo4j_service.get_comprehensive_graph_data(entity_ids)
         except Exception as e:
-            logger.error(f"Failed to get comprehensive graph data: {e}")
+            logger.error("Failed to get comprehensive graph data: %s", e)
             return {
                 'total_entities': 0,
                 'entities': {},
@@ -606,7 +640,7 @@ class RiskService:
         try:
             return self.neo4j_service.get_comprehensive_relationships(entity_ids)
         except Exception as e:
-            logger.error(f"Failed to get comprehensive relationships: {e}")
+            logger.error("Failed to get comprehensive relationships: %s", e)
             return {
                 'total_entities': 0,
                 'connected_entities': 0,
@@ -718,8 +752,11 @@ class RiskService:
         highest_confidence = 0
         matched = False
         max_risk_score = 0
+        failed_entities = []
         
         for entity_key, result in sanctions_results.items():
+            if result.get('status') == 'check_failed':
+                failed_entities.append(entity_key)
             matches = result.get('matches', [])
             all_matches.extend([{**match, 'entity_type': entity_key} for match in matches])
             total_matches += result.get('total_matches', 0)
@@ -734,8 +771,9 @@ class RiskService:
             'highest_confidence': highest_confidence,
             'matched': matched,
             'risk_score': max_risk_score,  # Include the OpenSanctions calculated risk score
-            'status': 'checked',
-            'entities_checked': list(sanctions_results.keys())
+            'status': 'check_failed' if failed_entities else 'checked',
+            'entities_checked': list(sanctions_results.keys()),
+            'entities_failed': failed_entities
         }
     
     def _build_web_intelligence_response(self, web_intelligence_results: Dict[str, Any]) -> Dict[str, Any]:
@@ -778,7 +816,7 @@ class RiskService:
                 try:
                     db_stats = self.neo4j_service.get_database_stats()
                 except Exception as e:
-                    logger.error(f"Failed to get Neo4j stats: {str(e)}")
+                    logger.error("Failed to get Neo4j stats: %s", e)
                     db_stats = {'error': str(e)}
             
             return {
@@ -798,7 +836,7 @@ class RiskService:
                 }
             }
         except Exception as e:
-            logger.error(f"Failed to get statistics: {str(e)}")
+            logger.error("Failed to get statistics: %s", e)
             return {
                 'error': 'Statistics unavailable',
                 'message': str(e)
@@ -812,6 +850,17 @@ class RiskService:
         risk_level = risk_calculation.get('risk_level', 'LOW')
         risk_score = risk_calculation.get('risk_score', 0)
         
+        if risk_calculation.get('sanctions_check_failed'):
+            recommendations.append({
+                'type': 'sanctions_check_failed',
+                'priority': 'high',
+                'message': 'Sanctions screening did not complete; the result is not a clearance',
+                'suggestions': [
+                    'Re-run the assessment',
+                    'Screen the entity manually if the check keeps failing'
+                ]
+            })
+        
         if risk_level in ['very_high', 'high'] or risk_score >= 70:
             recommendations.append({
                 'type': 'high_risk',
@@ -887,9 +936,9 @@ class RiskService:
                 company.get('country', '')
             ])
         
-        # Join parts and create a hash
+        # Join parts and create a hash - hash() is salted per process, so use a stable digest
         key_string = '|'.join(filter(None, key_parts))
-        return f"risk_assessment:{hash(key_string)}"
+        return f"risk_assessment:{hashlib.blake2b(key_string.encode('utf-8'), digest_size=16).hexdigest()}"
 
     def _get_risk_level(self, risk_score: int) -> str:
         """Get risk level based on score with improved thresholds"""
@@ -907,4 +956,4 @@ class RiskService:
     def set_fast_mode(self, enabled: bool):
         """Enable or disable fast mode"""
         self.fast_mode = enabled
-        logger.info(f"Fast mode {'enabled' if enabled else 'disabled'} for risk service") 
\ No newline at end of file
+        logger.info("Fast mode %s for risk service", 'enabled' if enabled else 'disabled') 
\ No newline at end of file
@@ -1,9 +1,11 @@
 import logging
-import requests
-import json
+import concurrent.futures
+import orjson
 import os
 from typing import Dict, Any, List
 import time
+from utils.http_client import create_http_session
+from utils.keyword_patterns import compile_keyword_map
 from config import (
     SERPER_API_KEY, PERPLEXITY_API_KEY, 
     MAX_WEB_RESULTS, API_TIMEOUT,
@@ -12,6 +14,23 @@ from config import (
 
 logger = logging.getLogger(__name__)
 
+# Risk keywords per indicator category, scanned in search result titles and snippets
+RISK_INDICATOR_KEYWORDS = {
+    'sanctions': ('sanctions', 'sanctioned', 'ofac', 'sdn list', 'embargo', 'asset freeze'),
+    'criminal': ('criminal', 'arrest', 'charged', 'convicted', 'fraud', 'embezzlement'),
+    'investigation': ('investigation', 'probe', 'inquiry', 'under investigation', 'being investigated'),
+    'money_laundering': ('money laundering', 'aml violation', 'financial crime', 'suspicious transactions'),
+    'terrorism': ('terrorism', 'terrorist', 'terror financing', 'terrorist organization'),
+    'corruption': ('corruption', 'bribery', 'corrupt', 'kickback', 'corrupt practices'),
+    'regulatory': ('regulatory violation', 'compliance violation', 'penalty', 'fine', 'settlement')
+}
+
+# Keyed by the indicator label reported for the category
+RISK_INDICATOR_PATTERNS = {
+    f"{category.replace('_', ' ').title()} indicators found": pattern
+    for category, pattern in compile_keyword_map(RISK_INDICATOR_KEYWORDS).items()
+}
+
 class WebSearchService:
     """Web search service for real-time entity intelligence"""
     
@@ -19,6 +38,8 @@ class WebSearchService:
         self.fast_mode = False
         self.serper_api_key = os.getenv('SERPER_API_KEY')
         self.perplexity_api_key = os.getenv('PERPLEXITY_API_KEY')
+        # Pooled keep-alive connections to the search providers
+        self.http = create_http_session()
         self.trusted_sources = {
             'bbc.com': 'News',
             'theguardian.com': 'News',
@@ -43,7 +64,7 @@ class WebSearchService:
     def set_fast_mode(self, enabled: bool):
         """Set fast mode for optimized performance"""
         self.fast_mode = enabled
-        logger.info(f"Web search fast mode {'enabled' if enabled else 'disabled'}")
+        logger.info("Web search fast mode %s", 'enabled' if enabled else 'disabled')
     
     def search_entity(self, entity_data: Dict[str, Any]) -> Dict[str, Any]:
         """Search for entity information using available APIs"""
@@ -64,21 +85,27 @@ class WebSearchService:
             results = []
             sources_searched = []
             
-            # Try Serper API
+            providers = []
             if self.serper_api_key:
-                serper_results = self._search_with_serper(entity_name, entity_type)
-                results.extend(serper_results)
-                sources_searched.append('Serper API')
-            
-            # Try Perplexity API
+                providers.append(('Serper API', self._search_with_serper))
             if self.perplexity_api_key:
-                perplexity_results = self._search_with_perplexity(entity_name, entity_type)
-                results.extend(perplexity_results)
-                sources_searched.append('Perplexity API')
+                providers.append(('Perplexity API', self._search_with_perplexity))
+            
+            # Query providers concurrently so latency is the slowest call, not the sum
+            if len(providers) > 1:
+                with concurrent.futures.ThreadPoolExecutor(max_workers=len(providers)) as executor:
+                    futures = [executor.submit(search, entity_name, entity_type) for _, search in providers]
+                    provider_results = [future.result() for future in futures]
+            else:
+                provider_results = [search(entity_name, entity_type) for _, search in providers]
+            
+            for (source_name, _), provider_result in zip(providers, provider_results):
+                results.extend(provider_result)
+                sources_searched.append(source_name)
             
             # If no APIs available, return empty but valid response
             if not results:
-                logger.info(f"No web search APIs available for {entity_name}")
+                logger.info("No web search APIs available for %s", entity_name)
                 return {
                     'results': [],
                     'total_results': 0,
@@ -106,7 +133,7 @@ class WebSearchService:
             }
             
         except Exception as e:
-            logger.error(f"Web search failed: {str(e)}")
+            logger.error("Web search failed: %s", e)
             return {
                 'results': [],
                 'total_results': 0,
@@ -134,10 +161,10 @@ class WebSearchService:
                 'num': 10 if not self.fast_mode else 5
             }
             
-            response = requests.post(url, headers=headers, json=payload, timeout=10)
+            response = self.http.post(url, headers=headers, data=orjson.dumps(payload), timeout=10)
             
             if response.status_code == 200:
-                data = response.json()
+                data = orjson.loads(response.content)
                 results = []
                 
                 for item in data.get('organic', []):
@@ -149,14 +176,14 @@ class WebSearchService:
                         'date': item.get('date', 'Unknown')
                     })
                 
-                logger.info(f"Serper API returned {len(results)} results for {entity_name}")
+                logger.info("Serper API returned %s results for %s", len(results), entity_name)
                 return results
             else:
-                logger.warning(f"Serper API failed with status {response.status_code}")
+                logger.warning("Serper API failed with status %s", response.status_code)
                 return []
                 
         except Exception as e:
-            logger.error(f"Serper API search failed: {str(e)}")
+            logger.error("Serper API search failed: %s", e)
             return []
     
     def _search_with_perplexity(self, entity_name: str, entity_type: str) -> List[Dict[str, Any]]:
@@ -183,23 +210,23 @@ class WebSearchService:
                 "return_citations": True
             }
             
-            response = requests.post(url, headers=headers, json=payload, timeout=15)
+            response = self.http.post(url, headers=headers, data=orjson.dumps(payload), timeout=15)
             
             if response.status_code == 200:
-                data = response.json()
+                data = orjson.loads(response.content)
                 content = data.get('choices', [{}])[0].get('message', {}).get('content', '')
                 citations = data.get('citations', [])
                 
                 # Parse the response to extract structured results
                 results = self._parse_perplexity_response(content, citations, entity_name)
-                logger.info(f"Perplexity API returned {len(results)} results for {entity_name}")
+                logger.info("Perplexity API returned %s results for %s", len(results), entity_name)
                 return results
             else:
-                logger.warning(f"Perplexity API failed with status {response.status_code}")
+                logger.warning("Perplexity API failed with status %s", response.status_code)
                 return []
                 
         except Exception as e:
-            logger.error(f"Perplexity API search failed: {str(e)}")
+            logger.error("Perplexity API search failed: %s", e)
             return []
     
     def _parse_perplexity_response(self, content: str, citations: List[Dict], entity_name: str) -> List[Dict[str, Any]]:
@@ -248,24 +275,17 @@ class WebSearchService:
     def _analyze_risk_indicators(self, results: List[Dict[str, Any]]) -> List[str]:
         """Analyze results for risk indicators"""
         risk_indicators = []
-        risk_keywords = {
-            'sanctions': ['sanctions', 'sanctioned', 'ofac', 'sdn list', 'embargo', 'asset freeze'],
-            'criminal': ['criminal', 'arrest', 'charged', 'convicted', 'fraud', 'embezzlement'],
-            'investigation': ['investigation', 'probe', 'inquiry', 'under investigation', 'being investigated'],
-            'money_laundering': ['money laundering', 'aml violation', 'financial crime', 'suspicious transactions'],
-            'terrorism': ['terrorism', 'terrorist', 'terror financing', 'terrorist organization'],
-            'corruption': ['corruption', 'bribery', 'corrupt', 'kickback', 'corrupt practices'],
-            'regulatory': ['regulatory violation', 'compliance violation', 'penalty', 'fine', 'settlement']
-        }
         
         for result in results:
             text = f"{result.get('title', '')} {result.get('snippet', '')}".lower()
             
-            for category, keywords in risk_keywords.items():
-                if any(keyword in text for keyword in keywords):
-                    indicator = f"{category.replace('_', ' ').title()} indicators found"
-                    if indicator not in risk_indicators:
-                        risk_indicators.append(indicator)
+            # Categories already reported are not scanned again
+            for indicator, pattern in RISK_INDICATOR_PATTERNS.items():
+                if indicator not in risk_indicators and pattern.search(text):
+                    risk_indicators.append(indicator)
+            
+            if len(risk_indicators) == len(RISK_INDICATOR_PATTERNS):
+                break
         
         return risk_indicators
     
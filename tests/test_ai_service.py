@@ -0,0 +1,39 @@
+import pytest
+
+from services.ai_service import AIService
+
+
+@pytest.fixture
+def service():
+    return AIService()
+
+
+def test_complete_json_reply_is_parsed(service):
+    content = '{"summary": "No adverse findings", "risk_indicators": [], "key_findings": [], "confidence": 0.8, "sentiment": 0.2}'
+
+    result = service._parse_ai_response(content, 'Example Corp', 'OpenAI')
+
+    assert result['summary'] == 'No adverse findings'
+    assert result['confidence'] == 0.8
+
+
+def test_truncated_json_reply_is_rejected(service):
+    content = '{"summary": "Example Corp was named in a 2021 enforcement action", "risk_indicators": ["sanc'
+
+    assert service._parse_ai_response(content, 'Example Corp', 'OpenAI') is None
+
+
+def test_truncated_fenced_json_reply_is_rejected(service):
+    content = '```json\n{"summary": "Example Corp was named in'
+
+    assert service._parse_ai_response(content, 'Example Corp', 'DeepSeek') is None
+
+
+def test_prose_reply_uses_text_heuristics(service):
+    content = 'Example Corp is under investigation for sanctions violations. High confidence.'
+
+    result = service._parse_ai_response(content, 'Example Corp', 'OpenAI')
+
+    assert result['summary'] == content
+    assert 'sanctions indicators' in result['risk_indicators']
+    assert result['confidence'] == 0.9
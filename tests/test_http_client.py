@@ -0,0 +1,67 @@
+import threading
+import time
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+import pytest
+import requests
+
+from utils.http_client import create_http_session
+
+
+class _Handler(BaseHTTPRequestHandler):
+    """Counts requests and answers with the server's configured behaviour"""
+
+    def do_POST(self):
+        self.server.hits += 1
+        self.rfile.read(int(self.headers.get('Content-Length', 0)))
+        if self.server.delay:
+            time.sleep(self.server.delay)
+        self.send_response(self.server.status)
+        self.send_header('Content-Length', '0')
+        self.end_headers()
+
+    def log_message(self, *args):
+        pass
+
+
+@pytest.fixture
+def server():
+    httpd = ThreadingHTTPServer(('127.0.0.1', 0), _Handler)
+    httpd.hits = 0
+    httpd.delay = 0
+    httpd.status = 200
+    thread = threading.Thread(target=httpd.serve_forever, daemon=True)
+    thread.start()
+    yield httpd
+    httpd.shutdown()
+    httpd.server_close()
+
+
+@pytest.fixture(autouse=True)
+def no_backoff(monkeypatch):
+    monkeypatch.setenv('HTTP_RETRY_BACKOFF', '0')
+
+
+def _url(server):
+    return f"http://127.0.0.1:{server.server_address[1]}/"
+
+
+def test_read_timeout_is_not_retried(server):
+    server.delay = 0.5
+    session = create_http_session(retries=3)
+
+    with pytest.raises(requests.exceptions.ReadTimeout):
+        session.post(_url(server), data=b'{}', timeout=0.1)
+
+    time.sleep(0.5)
+    assert server.hits == 1
+
+
+def test_retryable_status_is_retried(server):
+    server.status = 503
+    session = create_http_session(retries=3)
+
+    response = session.post(_url(server), data=b'{}', timeout=5)
+
+    assert response.status_code == 503
+    assert server.hits == 4
@@ -1,12 +1,63 @@
 import logging
-import json
+import orjson
 import os
+import threading
 import redis
+from collections import OrderedDict
 from typing import Any, Optional, Dict
 import time
 
 logger = logging.getLogger(__name__)
 
+_MISSING = object()
+
+class LocalTTLCache:
+    """Thread-safe in-process LRU cache with per-entry expiry"""
+    
+    def __init__(self, maxsize: int = 1024, ttl: int = 60):
+        self.maxsize = maxsize
+        self.ttl = ttl
+        self._data = OrderedDict()
+        self._lock = threading.RLock()
+    
+    def get(self, key: str, default: Any = None) -> Any:
+        """Get a live entry, dropping it if it has expired"""
+        with self._lock:
+            item = self._data.get(key, _MISSING)
+            if item is _MISSING:
+                return default
+            
+            expires_at, value = item
+            if expires_at <= time.monotonic():
+                del self._data[key]
+                return default
+            
+            self._data.move_to_end(key)
+            return value
+    
+    def set(self, key: str, value: Any, ttl: Optional[int] = None):
+        """Store an entry, evicting the least recently used ones beyond maxsize"""
+        expires_at = time.monotonic() + (ttl if ttl is not None else self.ttl)
+        with self._lock:
+            self._data[key] = (expires_at, value)
+            self._data.move_to_end(key)
+            while len(self._data) > self.maxsize:
+                self._data.popitem(last=False)
+    
+    def delete(self, key: str) -> bool:
+        """Remove an entry if present"""
+        with self._lock:
+            return self._data.pop(key, _MISSING) is not _MISSING
+    
+    def clear(self):
+        """Remove all entries"""
+        with self._lock:
+            self._data.clear()
+    
+    def __len__(self) -> int:
+        with self._lock:
+            return len(self._data)
+
 class CacheManager:
     """Redis cache manager for storing risk assessment results"""
     
@@ -17,6 +68,14 @@ class CacheManager:
         self.redis_password = os.getenv('REDIS_PASSWORD')
         self.cache_ttl = int(os.getenv('CACHE_TTL', 3600))  # 1 hour default
         
+        # Per-process L1 in front of Redis holding the serialized entries, so every hit decodes a
+        # private copy identical to a Redis hit. Kept short-lived since other workers can't
+        # invalidate it: clearing the cache only empties the L1 of the worker handling the call
+        self.local_cache = LocalTTLCache(
+            maxsize=int(os.getenv('LOCAL_CACHE_SIZE', 1024)),
+            ttl=int(os.getenv('LOCAL_CACHE_TTL', 60))
+        )
+        
         self.redis_client = None
         self._initialize_connection()
     
@@ -44,7 +103,7 @@ class CacheManager:
             logger.info("Successfully connected to Redis cache")
             
         except Exception as e:
-            logger.warning(f"Failed to connect to Redis: {str(e)}")
+            logger.warning("Failed to connect to Redis: %s", e)
             # Continue without cache
             self.redis_client = None
     
@@ -58,27 +117,33 @@ class CacheManager:
         Returns:
             Cached data or None if not found
         """
+        local_data = self.local_cache.get(key)
+        if local_data is not None:
+            logger.debug("Local cache hit for key: %s", key)
+            return orjson.loads(local_data)
+        
         if not self.redis_client:
             return None
         
         try:
             cached_data = self.redis_client.get(f"risknet:{key}")
             if cached_data:
-                data = json.loads(cached_data)
+                data = orjson.loads(cached_data)
                 
                 # Check if data has expired (additional safety check)
                 if 'cached_at' in data:
                     cached_at = data['cached_at']
-                    if time.time() - cached_at > self.cache_ttl:
+                    if time.time() - cached_at > data.get('cache_ttl', self.cache_ttl):
                         # Data is expired, remove it
                         self.delete(key)
                         return None
                 
-                logger.debug(f"Cache hit for key: {key}")
+                logger.debug("Cache hit for key: %s", key)
+                self.local_cache.set(key, cached_data)
                 return data
             
-        except (redis.RedisError, json.JSONDecodeError) as e:
-            logger.warning(f"Error getting cached data for key {key}: {str(e)}")
+        except (redis.RedisError, orjson.JSONDecodeError) as e:
+            logger.warning("Error getting cached data for key %s: %s", key, e)
         
         return None
     
@@ -94,22 +159,28 @@ class CacheManager:
         Returns:
             True if successful, False otherwise
         """
+        # Use provided TTL or default
+        ttl_to_use = ttl if ttl is not None else self.cache_ttl
+        
+        # Add metadata to cached data
+        cache_data = {
+            **value,
+            'cached_at': time.time(),
+            'cache_key': key,
+            'cache_ttl': ttl_to_use
+        }
+        try:
+            serialized_data = orjson.dumps(cache_data, default=self._json_serializer, option=orjson.OPT_NON_STR_KEYS)
+        except orjson.JSONEncodeError as e:
+            logger.warning("Error serializing data for key %s: %s", key, e)
+            return False
+        
+        self.local_cache.set(key, serialized_data, min(ttl_to_use, self.local_cache.ttl))
+        
         if not self.redis_client:
             return False
         
         try:
-            # Add metadata to cached data
-            cache_data = {
-                **value,
-                'cached_at': time.time(),
-                'cache_key': key
-            }
-            
-            serialized_data = json.dumps(cache_data, default=self._json_serializer)
-            
-            # Use provided TTL or default
-            ttl_to_use = ttl if ttl is not None else self.cache_ttl
-            
             # Set with expiration
             result = self.redis_client.setex(
                 f"risknet:{key}", 
@@ -118,11 +189,11 @@ class CacheManager:
             )
             
             if result:
-                logger.debug(f"Cached data for key: {key} (TTL: {ttl_to_use}s)")
+                logger.debug("Cached data for key: %s (TTL: %ss)", key, ttl_to_use)
                 return True
             
-        except (redis.RedisError, json.JSONDecodeError) as e:
-            logger.warning(f"Error caching data for key {key}: {str(e)}")
+        except redis.RedisError as e:
+            logger.warning("Error caching data for key %s: %s", key, e)
         
         return False
     
@@ -136,17 +207,19 @@ class CacheManager:
         Returns:
             True if successful, False otherwise
         """
+        self.local_cache.delete(key)
+        
         if not self.redis_client:
             return False
         
         try:
             result = self.redis_client.delete(f"risknet:{key}")
             if result:
-                logger.debug(f"Deleted cache key: {key}")
+                logger.debug("Deleted cache key: %s", key)
                 return True
         
         except redis.RedisError as e:
-            logger.warning(f"Error deleting cache key {key}: {str(e)}")
+            logger.warning("Error deleting cache key %s: %s", key, e)
         
         return False
     
@@ -167,7 +240,7 @@ class CacheManager:
             return bool(self.redis_client.exists(f"risknet:{key}"))
         
         except redis.RedisError as e:
-            logger.warning(f"Error checking cache key existence {key}: {str(e)}")
+            logger.warning("Error checking cache key existence %s: %s", key, e)
             return False
     
     def get_stats(self) -> Dict[str, Any]:
@@ -182,7 +255,8 @@ class CacheManager:
                 'status': 'disconnected',
                 'total_keys': 0,
                 'memory_usage': 0,
-                'hit_ratio': 0.0
+                'hit_ratio': 0.0,
+                'local_keys': len(self.local_cache)
             }
         
         try:
@@ -200,7 +274,8 @@ class CacheManager:
                 'connected_clients': info.get('connected_clients', 0),
                 'keyspace_hits': info.get('keyspace_hits', 0),
                 'keyspace_misses': info.get('keyspace_misses', 0),
-                'uptime_seconds': info.get('uptime_in_seconds', 0)
+                'uptime_seconds': info.get('uptime_in_seconds', 0),
+                'local_keys': len(self.local_cache)
             }
             
             # Calculate hit ratio
@@ -216,7 +291,7 @@ class CacheManager:
             return stats
             
         except redis.RedisError as e:
-            logger.warning(f"Error getting cache stats: {str(e)}")
+            logger.warning("Error getting cache stats: %s", e)
             return {
                 'status': 'error',
                 'error': str(e)
@@ -243,26 +318,26 @@ class CacheManager:
                 try:
                     data = self.redis_client.get(key)
                     if data:
-                        parsed_data = json.loads(data)
+                        parsed_data = orjson.loads(data)
                         cached_at = parsed_data.get('cached_at', 0)
                         
                         # Check if expired
-                        if current_time - cached_at > self.cache_ttl:
+                        if current_time - cached_at > parsed_data.get('cache_ttl', self.cache_ttl):
                             self.redis_client.delete(key)
                             deleted_count += 1
                             
-                except (json.JSONDecodeError, KeyError):
+                except (orjson.JSONDecodeError, KeyError):
                     # Invalid data format, delete it
                     self.redis_client.delete(key)
                     deleted_count += 1
             
             if deleted_count > 0:
-                logger.info(f"Cleaned up {deleted_count} expired cache entries")
+                logger.info("Cleaned up %s expired cache entries", deleted_count)
             
             return deleted_count
             
         except redis.RedisError as e:
-            logger.warning(f"Error flushing expired cache: {str(e)}")
+            logger.warning("Error flushing expired cache: %s", e)
             return 0
     
     def clear_all(self) -> bool:
@@ -272,6 +347,8 @@ class CacheManager:
         Returns:
             True if successful, False otherwise
         """
+        self.local_cache.clear()
+        
         if not self.redis_client:
             return False
         
@@ -279,13 +356,13 @@ class CacheManager:
             keys = self.redis_client.keys("risknet:*")
             if keys:
                 deleted_count = self.redis_client.delete(*keys)
-                logger.info(f"Cleared {deleted_count} cache entries")
+                logger.info("Cleared %s cache entries", deleted_count)
                 return True
             
             return True
             
         except redis.RedisError as e:
-            logger.warning(f"Error clearing cache: {str(e)}")
+            logger.warning("Error clearing cache: %s", e)
             return False
     
     def test_connection(self) -> bool:
@@ -348,9 +425,9 @@ class CacheManager:
             cached_at = None
             if data:
                 try:
-                    parsed_data = json.loads(data)
+                    parsed_data = orjson.loads(data)
                     cached_at = parsed_data.get('cached_at')
-                except json.JSONDecodeError:
+                except orjson.JSONDecodeError:
                     pass
             
             return {
@@ -363,7 +440,7 @@ class CacheManager:
             }
             
         except redis.RedisError as e:
-            logger.warning(f"Error getting cache key info for {key}: {str(e)}")
+            logger.warning("Error getting cache key info for %s: %s", key, e)
             return None
     
     def close(self):
@@ -373,7 +450,7 @@ class CacheManager:
                 self.redis_client.close()
                 logger.info("Redis connection closed")
             except redis.RedisError as e:
-                logger.warning(f"Error closing Redis connection: {str(e)}")
+                logger.warning("Error closing Redis connection: %s", e)
 
     def _get_timestamp(self) -> int:
         """Get current timestamp"""
@@ -381,8 +458,9 @@ class CacheManager:
 
     def clear(self):
         """Clear all cached results"""
+        self.local_cache.clear()
         try:
             self.redis_client.flushall()
             logger.info("Cache cleared successfully")
         except Exception as e:
-            logger.error(f"Cache clear error: {str(e)}") 
\ No newline at end of file
+            logger.error("Cache clear error: %s", e) 
\ No newline at end of file
@@ -0,0 +1,43 @@
+import logging
+import os
+import requests
+from requests.adapters import HTTPAdapter
+from urllib3.util.retry import Retry
+
+logger = logging.getLogger(__name__)
+
+# Rate limits and transient upstream failures worth retrying
+RETRY_STATUS_CODES = (429, 500, 502, 503, 504)
+
+def create_http_session(pool_maxsize: int = None, retries: int = 0) -> requests.Session:
+    """Create a requests session whose keep-alive pool is shared by all request threads"""
+    pool_maxsize = pool_maxsize or int(os.getenv('HTTP_POOL_MAXSIZE', 32))
+
+    # Retries back off exponentially and honour Retry-After on 429/503 responses.
+    # Only failures to connect and retryable status codes are retried: a read timeout or
+    # an error after the request was sent could repeat a paid, non-idempotent POST
+    max_retries = Retry(
+        total=retries,
+        connect=retries,
+        read=False,
+        status=retries,
+        other=False,
+        backoff_factor=float(os.getenv('HTTP_RETRY_BACKOFF', 0.5)),
+        status_forcelist=RETRY_STATUS_CODES,
+        allowed_methods=frozenset({'GET', 'POST'}),
+        respect_retry_after_header=True,
+        raise_on_status=False
+    ) if retries else 0
+
+    adapter = HTTPAdapter(
+        pool_connections=int(os.getenv('HTTP_POOL_CONNECTIONS', 10)),
+        pool_maxsize=pool_maxsize,
+        max_retries=max_retries
+    )
+
+    session = requests.Session()
+    session.mount('https://', adapter)
+    session.mount('http://', adapter)
+
+    logger.debug("HTTP session created with pool size %s", pool_maxsize)
+    return session
@@ -0,0 +1,13 @@
+import re
+from typing import Dict, Iterable, Pattern
+
+# Keyword lists are compiled into a single alternation so a text is scanned once per
+# list instead of once per keyword; callers lowercase the text before searching it
+
+def compile_keywords(keywords: Iterable[str]) -> Pattern:
+    """Compile literal keywords into one alternation pattern"""
+    return re.compile('|'.join(map(re.escape, keywords)))
+
+def compile_keyword_map(keyword_map: Dict[str, Iterable[str]]) -> Dict[str, Pattern]:
+    """Compile a category to keywords mapping into one pattern per category"""
+    return {category: compile_keywords(keywords) for category, keywords in keyword_map.items()}
@@ -1,5 +1,7 @@
 import logging
+import threading
 import time
+from collections import deque
 from typing import Dict, Any
 from datetime import datetime
 
@@ -10,91 +12,103 @@ class PerformanceMonitor:
     
     def __init__(self):
         """Initialize performance monitor"""
-        self.metrics = {
+        self.metrics = self._empty_metrics()
+        # Guards metrics updates when served by multi-threaded workers
+        self._lock = threading.Lock()
+        logger.info("Performance monitor initialized")
+    
+    @staticmethod
+    def _empty_metrics() -> Dict[str, Any]:
+        """Build a fresh metrics structure"""
+        return {
             'total_requests': 0,
             'successful_requests': 0,
             'failed_requests': 0,
             'average_response_time': 0,
             'start_time': time.time(),
-            'request_times': [],
+            'request_times': deque(maxlen=1000),  # Keep last 1000 requests
+            'request_time_total': 0.0,
             'endpoint_stats': {}
         }
-        logger.info("Performance monitor initialized")
+    
+    @staticmethod
+    def _record_duration(stats: Dict[str, Any], duration: float):
+        """Add a sample to a bounded window and update its running average"""
+        window = stats['request_times']
+        if len(window) == window.maxlen:
+            stats['request_time_total'] -= window[0]
+        window.append(duration)
+        stats['request_time_total'] += duration
+        stats['average_response_time'] = stats['request_time_total'] / len(window)
     
     def track_request(self, endpoint: str, start_time: float, success: bool = True):
-        """Track a request's performance"""
+        """Track a request's performance; start_time must come from time.perf_counter()"""
         try:
             # Calculate request duration
-            duration = time.time() - start_time
+            duration = time.perf_counter() - start_time
             
-            # Update basic metrics
-            self.metrics['total_requests'] += 1
-            if success:
-                self.metrics['successful_requests'] += 1
-            else:
-                self.metrics['failed_requests'] += 1
+            with self._lock:
+                # Update basic metrics
+                self.metrics['total_requests'] += 1
+                if success:
+                    self.metrics['successful_requests'] += 1
+                else:
+                    self.metrics['failed_requests'] += 1
             
-            # Update request times
-            self.metrics['request_times'].append(duration)
-            if len(self.metrics['request_times']) > 1000:  # Keep last 1000 requests
-                self.metrics['request_times'] = self.metrics['request_times'][-1000:]
-            
-            # Update average response time
-            self.metrics['average_response_time'] = sum(self.metrics['request_times']) / len(self.metrics['request_times'])
-            
-            # Update endpoint statistics
-            if endpoint not in self.metrics['endpoint_stats']:
-                self.metrics['endpoint_stats'][endpoint] = {
-                    'total_requests': 0,
-                    'successful_requests': 0,
-                    'failed_requests': 0,
-                    'average_response_time': 0,
-                    'request_times': []
-                }
+                # Update request times and average response time
+                self._record_duration(self.metrics, duration)
             
-            endpoint_stats = self.metrics['endpoint_stats'][endpoint]
-            endpoint_stats['total_requests'] += 1
-            if success:
-                endpoint_stats['successful_requests'] += 1
-            else:
-                endpoint_stats['failed_requests'] += 1
+                # Update endpoint statistics
+                if endpoint not in self.metrics['endpoint_stats']:
+                    self.metrics['endpoint_stats'][endpoint] = {
+                        'total_requests': 0,
+                        'successful_requests': 0,
+                        'failed_requests': 0,
+                        'average_response_time': 0,
+                        'request_times': deque(maxlen=100),  # Keep last 100 requests per endpoint
+                        'request_time_total': 0.0
+                    }
             
-            endpoint_stats['request_times'].append(duration)
-            if len(endpoint_stats['request_times']) > 100:  # Keep last 100 requests per endpoint
-                endpoint_stats['request_times'] = endpoint_stats['request_times'][-100:]
+                endpoint_stats = self.metrics['endpoint_stats'][endpoint]
+                endpoint_stats['total_requests'] += 1
+                if success:
+                    endpoint_stats['successful_requests'] += 1
+                else:
+                    endpoint_stats['failed_requests'] += 1
             
-            endpoint_stats['average_response_time'] = sum(endpoint_stats['request_times']) / len(endpoint_stats['request_times'])
+                self._record_duration(endpoint_stats, duration)
             
         except Exception as e:
-            logger.error(f"Error tracking request performance: {str(e)}")
+            logger.error("Error tracking request performance: %s", e)
     
     def get_metrics(self) -> Dict[str, Any]:
         """Get current performance metrics"""
         try:
-            uptime = time.time() - self.metrics['start_time']
-            hours = int(uptime // 3600)
-            minutes = int((uptime % 3600) // 60)
-            seconds = int(uptime % 60)
+            with self._lock:
+                uptime = time.time() - self.metrics['start_time']
+                hours = int(uptime // 3600)
+                minutes = int((uptime % 3600) // 60)
+                seconds = int(uptime % 60)
             
-            return {
-                'total_requests': self.metrics['total_requests'],
-                'successful_requests': self.metrics['successful_requests'],
-                'failed_requests': self.metrics['failed_requests'],
-                'average_response_time': round(self.metrics['average_response_time'] * 1000, 2),  # Convert to milliseconds
-                'uptime': f"{hours}h {minutes}m {seconds}s",
-                'endpoint_stats': {
-                    endpoint: {
-                        'total_requests': stats['total_requests'],
-                        'successful_requests': stats['successful_requests'],
-                        'failed_requests': stats['failed_requests'],
-                        'average_response_time': round(stats['average_response_time'] * 1000, 2)  # Convert to milliseconds
-                    }
-                    for endpoint, stats in self.metrics['endpoint_stats'].items()
-                },
-                'timestamp': datetime.now().isoformat()
-            }
+                return {
+                    'total_requests': self.metrics['total_requests'],
+                    'successful_requests': self.metrics['successful_requests'],
+                    'failed_requests': self.metrics['failed_requests'],
+                    'average_response_time': round(self.metrics['average_response_time'] * 1000, 2),  # Convert to milliseconds
+                    'uptime': f"{hours}h {minutes}m {seconds}s",
+                    'endpoint_stats': {
+                        endpoint: {
+                            'total_requests': stats['total_requests'],
+                            'successful_requests': stats['successful_requests'],
+                            'failed_requests': stats['failed_requests'],
+                            'average_response_time': round(stats['average_response_time'] * 1000, 2)  # Convert to milliseconds
+                        }
+                        for endpoint, stats in self.metrics['endpoint_stats'].items()
+                    },
+                    'timestamp': datetime.now().isoformat()
+                }
         except Exception as e:
-            logger.error(f"Error getting performance metrics: {str(e)}")
+            logger.error("Error getting performance metrics: %s", e)
             return {
                 'error': 'Failed to get performance metrics',
                 'message': str(e)
@@ -103,15 +117,8 @@ class PerformanceMonitor:
     def reset_metrics(self):
         """Reset all performance metrics"""
         try:
-            self.metrics = {
-                'total_requests': 0,
-                'successful_requests': 0,
-                'failed_requests': 0,
-                'average_response_time': 0,
-                'start_time': time.time(),
-                'request_times': [],
-                'endpoint_stats': {}
-            }
+            with self._lock:
+                self.metrics = self._empty_metrics()
             logger.info("Performance metrics reset")
         except Exception as e:
-            logger.error(f"Error resetting performance metrics: {str(e)}") 
\ No newline at end of file
+            logger.error("Error resetting performance metrics: %s", e) 
\ No newline at end of file
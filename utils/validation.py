@@ -6,6 +6,37 @@ from email_validator import validate_email, EmailNotValidError
 
 logger = logging.getLogger(__name__)
 
+# Patterns are compiled once at import instead of on every validation call
+PHONE_FORMATTING_RE = re.compile(r'[\s\-\(\)\.]')
+PHONE_NON_DIALABLE_RE = re.compile(r'[^\d+]')
+NON_DIGIT_RE = re.compile(r'[^\d]')
+DIGIT_RUN_RE = re.compile(r'\d{7,}')
+PHONE_PATTERNS = (
+    re.compile(r'^\+\d{1,3}\d{7,12}$'),  # International format
+    re.compile(r'^\d{10}$'),             # 10-digit US format
+    re.compile(r'^\d{11}$'),             # 11-digit with country code
+    re.compile(r'^\+1\d{10}$'),          # US international format
+    re.compile(r'^\+\d{1,3}-\d{3,4}-\d{3,4}-\d{3,4}$')  # Hyphenated international
+)
+EMAIL_RE = re.compile(r'^[a-zA-Z0-9._%+-]+@[a-zA-Z0-9.-]+\.[a-zA-Z]{2,}$')
+DATE_PATTERNS = (
+    re.compile(r'^\d{4}-\d{2}-\d{2}$'),  # YYYY-MM-DD
+    re.compile(r'^\d{2}/\d{2}/\d{4}$'),  # MM/DD/YYYY
+    re.compile(r'^\d{2}-\d{2}-\d{4}$')   # DD-MM-YYYY
+)
+SUSPICIOUS_RE = re.compile('|'.join([
+    r'<script[^>]*>',  # Script tags
+    r'javascript:',     # JavaScript URLs
+    r'on\w+\s*=',      # Event handlers
+    r'eval\s*\(',      # Eval function
+    r'alert\s*\(',     # Alert function
+    r'document\.',     # Document object
+    r'window\.',       # Window object
+    r'\.\./',          # Directory traversal
+    r'[<>]',           # HTML tags
+    r'[\x00-\x08\x0B\x0C\x0E-\x1F\x7F]'  # Control characters
+]))
+
 class InputValidator:
     """Enhanced input validator for flexible person/company data structures"""
     
@@ -164,9 +195,9 @@ class InputValidator:
             try:
                 validated['phone'] = self._validate_phone(phone)
             except ValueError as e:
-                logger.warning(f"Company phone validation warning: {str(e)}")
+                logger.warning("Company phone validation warning: %s", e)
                 # For companies, be more lenient with phone numbers
-                if re.search(r'\d{7,}', phone):
+                if DIGIT_RUN_RE.search(phone):
                     validated['phone'] = phone
         
         # Optional: address
@@ -230,7 +261,7 @@ class InputValidator:
                 if self.name_pattern.match(name):
                     validated_director['name'] = name
                 else:
-                    logger.warning(f"Invalid director name format: {name}")
+                    logger.warning("Invalid director name format: %s", name)
                     continue
             
             # Position/title
@@ -246,7 +277,7 @@ class InputValidator:
                 try:
                     validated_director['appointment_date'] = self._validate_date(appointment_date)
                 except ValueError:
-                    logger.warning(f"Invalid appointment date format: {appointment_date}")
+                    logger.warning("Invalid appointment date format: %s", appointment_date)
             
             # Status
             status = director.get('status', '').strip()
@@ -271,7 +302,7 @@ class InputValidator:
         """Validate phone number format with more lenient validation"""
         try:
             # Remove common formatting characters
-            cleaned_phone = re.sub(r'[\s\-\(\)\.]', '', phone)
+            cleaned_phone = PHONE_FORMATTING_RE.sub('', phone)
             
             # Try parsing with phonenumbers library
             try:
@@ -285,25 +316,16 @@ class InputValidator:
             
             # Fallback: more lenient validation for various formats
             # Remove all non-digit characters except +
-            digits_only = re.sub(r'[^\d+]', '', phone)
+            digits_only = PHONE_NON_DIALABLE_RE.sub('', phone)
             
             # Basic length validation (7-15 digits is reasonable for most phone numbers)
-            digit_count = len(re.sub(r'[^\d]', '', digits_only))
+            digit_count = len(NON_DIGIT_RE.sub('', digits_only))
             if digit_count < 7 or digit_count > 15:
                 raise ValueError(f"Invalid phone number length: {phone}")
             
-            # Accept various common formats
-            common_patterns = [
-                r'^\+\d{1,3}\d{7,12}$',  # International format
-                r'^\d{10}$',             # 10-digit US format
-                r'^\d{11}$',             # 11-digit with country code
-                r'^\+1\d{10}$',          # US international format
-                r'^\+\d{1,3}-\d{3,4}-\d{3,4}-\d{3,4}$'  # Hyphenated international
-            ]
-            
             # If it matches any common pattern, accept it
-            for pattern in common_patterns:
-                if re.match(pattern, digits_only):
+            for pattern in PHONE_PATTERNS:
+                if pattern.match(digits_only):
                     return phone  # Return original format
             
             # If none match, it's still possibly valid - be lenient
@@ -315,9 +337,9 @@ class InputValidator:
         except ValueError:
             raise
         except Exception as e:
-            logger.warning(f"Phone validation error: {str(e)}")
+            logger.warning("Phone validation error: %s", e)
             # Be very lenient - if there's any error, just accept it if it has digits
-            if re.search(r'\d{7,}', phone):
+            if DIGIT_RUN_RE.search(phone):
                 return phone
             raise ValueError(f"Invalid phone number format: {phone}")
     
@@ -326,7 +348,7 @@ class InputValidator:
         email = email.strip().lower()
         
         # Basic email format validation
-        if not re.match(r'^[a-zA-Z0-9._%+-]+@[a-zA-Z0-9.-]+\.[a-zA-Z]{2,}$', email):
+        if not EMAIL_RE.match(email):
             raise ValueError(f"Invalid email format: {email}")
         
         # Additional checks
@@ -342,13 +364,7 @@ class InputValidator:
     def _validate_date(self, date_str: str) -> str:
         """Validate date format (YYYY-MM-DD or similar)"""
         # Basic date format validation
-        date_patterns = [
-            r'^\d{4}-\d{2}-\d{2}$',  # YYYY-MM-DD
-            r'^\d{2}/\d{2}/\d{4}$',  # MM/DD/YYYY
-            r'^\d{2}-\d{2}-\d{4}$'   # DD-MM-YYYY
-        ]
-        
-        if not any(re.match(pattern, date_str) for pattern in date_patterns):
+        if not any(pattern.match(date_str) for pattern in DATE_PATTERNS):
             raise ValueError(f"Invalid date format: {date_str}. Use YYYY-MM-DD, MM/DD/YYYY, or DD-MM-YYYY")
         
         return date_str
@@ -498,26 +514,7 @@ class InputValidator:
     
     def _contains_suspicious_patterns(self, text: str) -> bool:
         """Check for suspicious patterns in text"""
-        suspicious_patterns = [
-            r'<script[^>]*>',  # Script tags
-            r'javascript:',     # JavaScript URLs
-            r'on\w+\s*=',      # Event handlers
-            r'eval\s*\(',      # Eval function
-            r'alert\s*\(',     # Alert function
-            r'document\.',     # Document object
-            r'window\.',       # Window object
-            r'\.\./',          # Directory traversal
-            r'[<>]',           # HTML tags
-            r'[\x00-\x08\x0B\x0C\x0E-\x1F\x7F]'  # Control characters
-        ]
-        
-        text_lower = text.lower()
-        
-        for pattern in suspicious_patterns:
-            if re.search(pattern, text_lower):
-                return True
-        
-        return False
+        return SUSPICIOUS_RE.search(text.lower()) is not None
     
     def validate_search_params(self, params: Dict[str, Any]) -> Dict[str, Any]:
         """Validate search parameters"""
@@ -0,0 +1,13 @@
+"""WSGI entry point for running the Risknet API under gunicorn"""
+import logging
+from app import app
+
+logger = logging.getLogger(__name__)
+
+# gunicorn -k gthread -w 4 --threads 16 -b 0.0.0.0:5000 wsgi:application
+application = app
+
+if __name__ == '__main__':
+    # Development server only - use gunicorn for anything else
+    logger.info("Starting Risknet API development server on port 5000")
+    application.run(host='0.0.0.0', port=5000, debug=True, threaded=True)